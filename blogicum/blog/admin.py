@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group
 
-from blog.models import Category, Comment, Location, Post
+from blog.models import (
+    AuthorStats, Category, Comment, ImageJob, Location, Post
+)
 
 admin.site.empty_value_display = 'не задано'
 
@@ -28,6 +30,8 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'location',
         'category',
+        'comment_count',
+        'image_status',
     )
     list_editable = (
         'is_published',
@@ -43,5 +47,23 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'post', 'author', 'text')
 
 
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'post_count',
+        'published_post_count',
+        'comment_count',
+        'last_post_date',
+    )
+    readonly_fields = list_display
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'post', 'image', 'status', 'attempts', 'run_after')
+    list_filter = ('status',)
+
+
 admin.site.register(Location)
 admin.site.unregister(Group)
@@ -0,0 +1,111 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from blog.constants import PROFILE_TIMEOUT
+from blog.models import Category, User
+
+PROFILE_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
+
+
+def version_key(scope, pk):
+    return f'blog:version:{scope}:{pk}'
+
+
+def bump_version(scope, pk):
+    """Делает недействительными все фрагменты, зависящие от объекта."""
+    cache.set(version_key(scope, pk), time.time_ns(), None)
+
+
+def get_versions(keys):
+    """Возвращает версии для ключей, заводя недостающие за один проход."""
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def related_values(obj, *fields):
+    return obj and tuple(getattr(obj, field) for field in fields)
+
+
+def post_card_key(post):
+    """Ключ карточки по данным, которые она показывает.
+
+    Данные берутся из той же выборки, по которой карточка рендерится,
+    поэтому после изменения поста, категории, местоположения или автора
+    ключ меняется в любом процессе, даже если его кэш не получал сигнала.
+    """
+    values = (
+        post.title, post.text, post.pub_date, post.is_published,
+        post.comment_count, post.image.name, post.image_status,
+        post.image_meta,
+        related_values(post.category, 'title', 'slug', 'is_published'),
+        related_values(post.location, 'name', 'is_published'),
+        related_values(post.author, 'username'),
+    )
+    return 'blog:post_card:{}:{}'.format(
+        post.pk, hashlib.md5(repr(values).encode()).hexdigest()
+    )
+
+
+def profile_key(username):
+    return f'blog:profile:{username}'
+
+
+def get_profile(username):
+    """Автор по username без обращения к auth_user на каждый запрос.
+
+    В кэше хранится только то, что нужно странице профиля; возвращается
+    несохраняемый экземпляр User с настоящим pk, поэтому сравнение
+    с `request.user` и `get_full_name()` работают как обычно.
+    """
+    summary = cache.get(profile_key(username))
+    if summary is None:
+        summary = User.objects.filter(username=username).values(
+            *PROFILE_FIELDS
+        ).first()
+        if summary is None:
+            return None
+        cache.set(profile_key(username), summary, PROFILE_TIMEOUT)
+    return User(**summary)
+
+
+def forget_profiles(*usernames):
+    cache.delete_many([profile_key(username) for username in usernames])
+
+
+def page_cache_key(path, scope_keys, *extra):
+    """Ключ страницы: адрес и версии всего, что на ней показано."""
+    keys = (version_key('site', 'all'), *scope_keys)
+    versions = get_versions(keys)
+    return 'blog:page:{}:{}'.format(
+        hashlib.md5(path.encode()).hexdigest(),
+        ':'.join(map(str, [versions[key] for key in keys] + list(extra))),
+    )
+
+
+def bump_feed_pages(category_ids=(), author_ids=()):
+    """Сбрасывает страницы лент, на которых могут быть посты.
+
+    Главная сбрасывается всегда, страницы категорий и профилей — только
+    для переданных категорий и авторов.
+    """
+    bump_version('feed', 'index')
+    category_ids = {pk for pk in category_ids if pk is not None}
+    author_ids = {pk for pk in author_ids if pk is not None}
+    if category_ids:
+        for slug in Category.objects.filter(
+            pk__in=category_ids
+        ).values_list('slug', flat=True):
+            bump_version('category_slug', slug)
+    if author_ids:
+        for username in User.objects.filter(
+            pk__in=author_ids
+        ).values_list('username', flat=True):
+            bump_version('username', username)
@@ -0,0 +1,103 @@
+import bisect
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.models import Post
+
+SCHEDULE_KEY = 'blog:publication_schedule'
+SCHEDULE_LIMIT = 100
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(moment):
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_micros(micros):
+    return EPOCH + micros * MICROSECOND
+
+
+def build_schedule(since):
+    """Ближайшие моменты публикации постов позже `since`.
+
+    Если отложенных постов больше `SCHEDULE_LIMIT`, расписание помечается
+    неполным и перестраивается, когда наступает последний известный момент.
+    """
+    pending = [
+        to_micros(pub_date) for pub_date in Post.objects.filter(
+            pub_date__gt=from_micros(since)
+        ).order_by('pub_date').values_list(
+            'pub_date', flat=True
+        )[:SCHEDULE_LIMIT + 1]
+    ]
+    schedule = {
+        'since': since,
+        'pending': pending[:SCHEDULE_LIMIT],
+        'complete': len(pending) <= SCHEDULE_LIMIT,
+    }
+    cache.set(SCHEDULE_KEY, schedule, settings.PUBLICATION_CLOCK_BUCKET)
+    return schedule
+
+
+def get_schedule(now, floor):
+    schedule = cache.get(SCHEDULE_KEY)
+    if (
+        schedule is None
+        or schedule['since'] > floor
+        or not schedule['complete'] and (
+            not schedule['pending'] or schedule['pending'][-1] <= now
+        )
+    ):
+        schedule = build_schedule(floor)
+    return schedule
+
+
+def schedule_publication(pub_date):
+    """Добавляет момент публикации сохранённого поста в расписание."""
+    schedule = cache.get(SCHEDULE_KEY)
+    if schedule is None:
+        return
+    moment = to_micros(pub_date)
+    if moment <= schedule['since'] or moment in schedule['pending']:
+        return
+    bisect.insort(schedule['pending'], moment)
+    if len(schedule['pending']) > SCHEDULE_LIMIT:
+        schedule['pending'].pop()
+        schedule['complete'] = False
+    cache.set(SCHEDULE_KEY, schedule, settings.PUBLICATION_CLOCK_BUCKET)
+
+
+def publication_state():
+    """Округлённое «сейчас» для запросов лент и ближайшая публикация.
+
+    «Сейчас» округляется вниз до `PUBLICATION_CLOCK_BUCKET` секунд, чтобы
+    текст запроса не менялся на каждом запросе. Посты, чья дата публикации
+    попала между границей интервала и настоящим моментом, не теряются:
+    «сейчас» сдвигается до последней такой даты из расписания.
+    Вторым значением возвращается ближайший будущий момент публикации —
+    до него выборка лент не меняется.
+    """
+    real_now = timezone.now()
+    bucket = settings.PUBLICATION_CLOCK_BUCKET
+    if not bucket:
+        return real_now, None
+    now = to_micros(real_now)
+    floor = now - now % (bucket * 10 ** 6)
+    pending = get_schedule(now, floor)['pending']
+    index = bisect.bisect_right(pending, now)
+    effective = max(floor, pending[index - 1]) if index else floor
+    upcoming = pending[index] if index < len(pending) else None
+    return from_micros(effective), upcoming
+
+
+def publication_now():
+    return publication_state()[0]
+
+
+def next_publication():
+    return publication_state()[1]
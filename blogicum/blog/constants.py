@@ -2,3 +2,27 @@ MAX_LENGTH = 256
 POSTS_LIMIT = 5
 RECORDS_LIMIT = 20
 PAGE_PAGINATOR = 10
+COMMENTS_PAGINATOR = 20
+POST_CARD_TIMEOUT = 24 * 60 * 60
+PROFILE_TIMEOUT = 10 * 60
+IMAGE_VARIANTS = {
+    'card': (480, 960),
+    'detail': (640, 1280),
+}
+IMAGE_SIZES = {
+    'card': '(max-width: 30rem) 100vw, 480px',
+    'detail': '(max-width: 40rem) 100vw, 640px',
+}
+IMAGE_QUALITY = 85
+WEBP_QUALITY = 80
+IMAGE_MAX_SIDE = 2560
+PLACEHOLDER_SIZE = (16, 16)
+PLACEHOLDER_QUALITY = 40
+PENDING_IMAGE_SRC = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+)
+IMAGE_JOB_ATTEMPTS = 3
+IMAGE_JOB_RETRY_DELAY = 60
+IMAGE_JOB_LEASE = 10 * 60
+IMAGE_JOB_BATCH = 20
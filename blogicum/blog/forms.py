@@ -1,6 +1,24 @@
 from django import forms
+from django.core.exceptions import ValidationError
 
 from blog.models import Comment, Post, User
+from core.uploads import check_dimensions
+
+
+class PostImageField(forms.ImageField):
+    """Поле изображения, понимающее отказы `ImageUploadHandler`.
+
+    Размеры проверяются по заголовку до того, как Pillow прочитает
+    файл целиком.
+    """
+
+    def to_python(self, data):
+        rejection = getattr(data, 'rejection', None)
+        if rejection is None and data and hasattr(data, 'seek'):
+            rejection = check_dimensions(data)
+        if rejection:
+            raise ValidationError(rejection, code='rejected')
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
@@ -8,6 +26,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': PostImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 format='%Y-%m-%d %H:%M:%S',
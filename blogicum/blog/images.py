@@ -0,0 +1,255 @@
+import base64
+import logging
+import os
+import re
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from blog.constants import (
+    IMAGE_MAX_SIDE, IMAGE_QUALITY, IMAGE_VARIANTS, PLACEHOLDER_QUALITY,
+    PLACEHOLDER_SIZE, WEBP_QUALITY
+)
+from core.storage import upload_name
+
+logger = logging.getLogger(__name__)
+
+RESIZABLE_FORMATS = ('JPEG', 'PNG', 'WEBP')
+RESIZABLE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+VARIANT_RE = re.compile(r'^(?P<stem>.+)__w(?P<width>\d+)(?P<ext>\.\w+)$')
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'photoshop', 'comment')
+
+
+def variant_name(name, width, extension=None):
+    """`post_images/photo.jpg` → `post_images/photo__w480.jpg`."""
+    root, ext = os.path.splitext(name)
+    return f'{root}__w{width}{extension or ext}'
+
+
+def variant_widths():
+    return sorted({
+        width for widths in IMAGE_VARIANTS.values() for width in widths
+    })
+
+
+def variant_of(name):
+    """Оригинал без расширения, копией которого может быть файл `name`.
+
+    `post_images/photo__w480.webp` → `post_images/photo`. Копией считается
+    только файл с шириной из `IMAGE_VARIANTS` или WebP в полный размер;
+    для остальных файлов возвращается None.
+    """
+    directory, filename = os.path.split(name)
+    match = VARIANT_RE.match(filename)
+    if match is None or (
+        int(match['width']) not in variant_widths()
+        and match['ext'] != '.webp'
+    ):
+        return None
+    return os.path.join(directory, match['stem'])
+
+
+def scaled_size(size, width):
+    original_width, original_height = size
+    return width, max(1, round(original_height * width / original_width))
+
+
+def describe(file):
+    """Размеры, формат и объём изображения.
+
+    Pillow читает только заголовок файла, пиксели не декодируются.
+    При ошибке возвращается пустой словарь.
+    """
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            meta = {
+                'width': image.width,
+                'height': image.height,
+                'format': image.format,
+            }
+        file.seek(0)
+        meta['bytes'] = file.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return {}
+    return meta
+
+
+def placeholder(image):
+    """Крошечная размытая копия как data URI для показа до загрузки."""
+    preview = image.copy()
+    preview.thumbnail(PLACEHOLDER_SIZE)
+    buffer = BytesIO()
+    preview.convert('RGB').save(buffer, 'JPEG', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/jpeg;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+def load(storage, name):
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    return image
+
+
+def process_image(storage, name):
+    """Полная обработка: уменьшенные копии и заглушка для `image_meta`.
+
+    Если оригинал пришлось очистить (`needs_normalizing`), копии делаются
+    с очищенного файла, а его имя и размеры возвращаются в `image`,
+    `width`, `height` и `bytes`.
+    """
+    image = load(storage, name)
+    result = {}
+    if needs_normalizing(image):
+        name = normalize(storage, name, image)
+        image = load(storage, name)
+        result = {
+            'image': name,
+            'width': image.width,
+            'height': image.height,
+            'bytes': storage.size(name),
+        }
+    make_variants(storage, name, image)
+    result['lqip'] = placeholder(image)
+    return result
+
+
+def save_variant(storage, name, image, image_format, **params):
+    if storage.exists(name):
+        # Копия файла с тем же содержимым уже готова.
+        return 0
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    with storage.open(name, 'wb') as target:
+        image.save(target, image_format, optimize=True, **params)
+    return storage.size(name)
+
+
+def make_variants(storage, name, image):
+    """Сохраняет уменьшенные копии изображения рядом с оригиналом.
+
+    Копии шире оригинала не создаются. Кроме копий в формате оригинала
+    сохраняются копии в WebP, включая WebP в полный размер. Возвращает
+    ширины созданных копий.
+    """
+    if image.format not in RESIZABLE_FORMATS:
+        return []
+    widths = [width for width in variant_widths() if width < image.width]
+    webp = image.format != 'WEBP'
+    fallback_bytes = webp_bytes = 0
+    for width in widths:
+        variant = image.resize(
+            scaled_size(image.size, width), Image.Resampling.LANCZOS
+        )
+        fallback_bytes += save_variant(
+            storage, variant_name(name, width), variant, image.format,
+            quality=IMAGE_QUALITY,
+        )
+        if webp:
+            webp_bytes += save_variant(
+                storage, variant_name(name, width, '.webp'), variant,
+                'WEBP', quality=WEBP_QUALITY,
+            )
+    if webp:
+        webp_bytes += save_variant(
+            storage, variant_name(name, image.width, '.webp'), image,
+            'WEBP', quality=WEBP_QUALITY,
+        )
+    if webp_bytes:
+        logger.info(
+            'Копии %s: %s байт в %s, %s байт в WebP',
+            name, fallback_bytes, image.format, webp_bytes,
+        )
+    return widths
+
+
+def variant_files(storage, name):
+    """Имена всех сохранённых копий файла `name`."""
+    directory, filename = os.path.split(name)
+    prefix = variant_name(filename, '')[:-len(os.path.splitext(filename)[1])]
+    try:
+        files = storage.listdir(directory)[1]
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(directory, file) for file in files
+        if file.startswith(prefix)
+    ]
+
+
+def needs_normalizing(image):
+    """В изображении есть метаданные, или оно больше `IMAGE_MAX_SIDE`."""
+    return image.format in RESIZABLE_FORMATS and (
+        max(image.size) > IMAGE_MAX_SIDE
+        or any(key in image.info for key in METADATA_KEYS)
+    )
+
+
+def normalize(storage, name, image):
+    """Сохраняет оригинал без метаданных и не больше `IMAGE_MAX_SIDE`.
+
+    Ориентация из EXIF применяется к пикселям. Возвращает имя нового
+    файла; прежний остаётся, пока на него ссылается пост.
+    """
+    image_format = image.format
+    cleaned = ImageOps.exif_transpose(image)
+    cleaned.thumbnail(
+        (IMAGE_MAX_SIDE, IMAGE_MAX_SIDE), Image.Resampling.LANCZOS
+    )
+    if image_format == 'JPEG' and cleaned.mode != 'RGB':
+        cleaned = cleaned.convert('RGB')
+    buffer = BytesIO()
+    cleaned.save(
+        buffer, image_format, quality=IMAGE_QUALITY, optimize=True,
+        icc_profile=image.info.get('icc_profile'),
+    )
+    logger.info(
+        'Оригинал %s: %s → %s байт', name, storage.size(name), buffer.tell()
+    )
+    return storage.save(upload_name(name), ContentFile(buffer.getvalue()))
+
+
+def image_sources(field, variant, meta=None):
+    """Атрибуты `<img>` и `<source>` для варианта `card` или `detail`.
+
+    Размеры берутся из сохранённых `meta`, а ширины копий вычисляются
+    по ним так же, как в `make_variants`, поэтому хранилище
+    не опрашивается. Вызывается только для обработанного изображения,
+    у которого копии уже готовы.
+    """
+    if meta and 'width' in meta:
+        size = (meta['width'], meta['height'])
+    else:
+        size = (field.width, field.height)
+    extension = os.path.splitext(field.name)[1].lower()
+    resizable = extension in RESIZABLE_EXTENSIONS
+    widths = [
+        width for width in IMAGE_VARIANTS[variant]
+        if resizable and width < size[0]
+    ]
+    url = field.storage.url
+    srcset = [f'{url(variant_name(field.name, w))} {w}w' for w in widths]
+    webp_widths = list(widths)
+    if len(widths) < len(IMAGE_VARIANTS[variant]):
+        srcset.append(f'{field.url} {size[0]}w')
+        webp_widths.append(size[0])
+    webp_srcset = ''
+    if resizable and extension != '.webp':
+        webp_srcset = ', '.join(
+            f'{url(variant_name(field.name, w, ".webp"))} {w}w'
+            for w in webp_widths
+        )
+    width, height = scaled_size(
+        size, min(IMAGE_VARIANTS[variant][0], size[0])
+    )
+    src = url(variant_name(field.name, widths[0])) if widths else field.url
+    return {
+        'src': src,
+        'srcset': ', '.join(srcset),
+        'webp_srcset': webp_srcset,
+        'width': width,
+        'height': height,
+    }
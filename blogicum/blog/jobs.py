@@ -0,0 +1,126 @@
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from blog.constants import (
+    IMAGE_JOB_ATTEMPTS, IMAGE_JOB_BATCH, IMAGE_JOB_LEASE,
+    IMAGE_JOB_RETRY_DELAY
+)
+from blog.images import process_image
+from blog.media import image_storage
+from blog.models import ImageJob, ImageStatus, Post
+from core.retry import retry_on_busy
+
+ACTIVE = (ImageJob.Status.PENDING, ImageJob.Status.RUNNING)
+
+
+def enqueue(post):
+    """Ставит в очередь обработку текущего изображения поста.
+
+    Прежние невыполненные задачи поста больше не нужны и удаляются.
+    Если `IMAGE_JOBS_ASYNC` выключена, задача выполняется сразу.
+    """
+    ImageJob.objects.filter(
+        post_id=post.pk, status=ImageJob.Status.PENDING
+    ).delete()
+    job = ImageJob.objects.create(post_id=post.pk, image=post.image.name)
+    if not settings.IMAGE_JOBS_ASYNC:
+        for claimed in claim(pks=[job.pk]):
+            finish(claimed, *run(claimed.image), post=post)
+    return job
+
+
+def process(name):
+    """Работа задачи; выполняется в процессе пула и не обращается к БД."""
+    return process_image(image_storage(), name)
+
+
+def run(name):
+    """Выполняет задачу в текущем процессе: `(результат, ошибка)`."""
+    try:
+        return process(name), None
+    except Exception as error:
+        return None, repr(error)
+
+
+@retry_on_busy
+def claim(limit=IMAGE_JOB_BATCH, pks=None):
+    """Забирает задачи из очереди.
+
+    Взятая задача получает срок аренды `IMAGE_JOB_LEASE`: если воркер
+    упадёт, по истечении срока задачу возьмёт другой.
+    """
+    now = timezone.now()
+    available = ImageJob.objects.filter(status__in=ACTIVE, run_after__lte=now)
+    if pks is not None:
+        available = available.filter(pk__in=pks)
+    claimed = [
+        pk for pk in available.values_list('pk', flat=True)[:limit]
+        if available.filter(pk=pk).update(
+            status=ImageJob.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            run_after=now + timedelta(seconds=IMAGE_JOB_LEASE),
+        )
+    ]
+    return list(ImageJob.objects.filter(pk__in=claimed))
+
+
+@retry_on_busy
+def finish(job, result=None, error=None, post=None):
+    """Записывает итог задачи; при ошибке задача повторяется с паузой."""
+    if error is None:
+        job.status, post_status = ImageJob.Status.DONE, ImageStatus.READY
+    elif job.attempts < IMAGE_JOB_ATTEMPTS:
+        job.status, post_status = ImageJob.Status.PENDING, None
+        job.run_after = timezone.now() + timedelta(
+            seconds=IMAGE_JOB_RETRY_DELAY * job.attempts
+        )
+    else:
+        job.status, post_status = ImageJob.Status.FAILED, ImageStatus.FAILED
+    job.last_error = error or ''
+    job.save(update_fields=('status', 'run_after', 'last_error'))
+    if post_status is None:
+        return
+    if post is None:
+        post = Post.objects.filter(pk=job.post_id, image=job.image).first()
+    # Пока задача ждала, изображение поста могли заменить.
+    if post is None or post.image.name != job.image:
+        return
+    result = dict(result or {})
+    image = result.pop('image', None)
+    fields = ['image_status', 'image_meta']
+    if image and image != job.image:
+        # Оригинал очищен от метаданных и сохранён под новым именем;
+        # копии для него уже готовы, повторная задача не нужна.
+        post.image.name = image
+        post._image_processed = True
+        fields.append('image')
+    post.image_status = post_status
+    post.image_meta = {**post.image_meta, **result}
+    try:
+        post.save(update_fields=fields)
+    finally:
+        post._image_processed = False
+
+
+def run_batch(executor=None, limit=IMAGE_JOB_BATCH):
+    """Выполняет пачку задач в пуле процессов `executor` или в текущем.
+
+    Возвращает число взятых задач.
+    """
+    jobs = claim(limit)
+    if executor is None:
+        for job in jobs:
+            finish(job, *run(job.image))
+        return len(jobs)
+    futures = {executor.submit(process, job.image): job for job in jobs}
+    for future in as_completed(futures):
+        error = future.exception()
+        if error is None:
+            finish(futures[future], future.result())
+        else:
+            finish(futures[future], error=repr(error))
+    return len(jobs)
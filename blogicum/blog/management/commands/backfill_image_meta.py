@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_version
+from blog.images import describe, load, placeholder
+from blog.media import image_storage
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет сведения об изображениях у постов, где их нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько постов обрабатывать за один запрос.',
+        )
+
+    def handle(self, *args, batch_size=100, **options):
+        storage = image_storage()
+        missing = Post.objects.exclude(image='').exclude(
+            image_meta__has_key='lqip'
+        ).only('pk', 'image', 'image_meta').order_by('pk')
+        last_pk = 0
+        filled = failed = 0
+        while True:
+            batch = list(missing.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            updated = []
+            for post in batch:
+                try:
+                    meta = describe(post.image)
+                    meta['lqip'] = placeholder(load(storage, post.image.name))
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f'Пост {post.pk}: {error}')
+                    continue
+                finally:
+                    post.image.close()
+                post.image_meta = meta
+                updated.append(post)
+            Post.objects.bulk_update(updated, ('image_meta',))
+            for post in updated:
+                bump_version('post', post.pk)
+            filled += len(updated)
+            self.stdout.write(f'Заполнено: {filled}, ошибок: {failed}')
+        if filled:
+            bump_version('site', 'all')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, заполнено: {filled}, ошибок: {failed}'
+        ))
@@ -0,0 +1,119 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import variant_of
+from blog.media import delete_files, image_storage
+from blog.models import Post, StoredFile
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет или переносит в карантин файлы изображений постов,'
+        ' на которые не ссылается ни один пост.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать найденные файлы, ничего не трогая.',
+        )
+        parser.add_argument(
+            '--quarantine',
+            metavar='DIR',
+            help='Переносить файлы в каталог DIR внутри MEDIA_ROOT.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько файлов сверять с базой за один запрос.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60 * 60,
+            help='Не трогать файлы моложе этого числа секунд.',
+        )
+
+    def handle(self, *args, dry_run, quarantine, batch_size, min_age,
+               **options):
+        self.storage = image_storage()
+        self.batch_size = batch_size
+        self.quarantine = quarantine and self.storage.path(quarantine)
+        root = self.storage.path(Post._meta.get_field('image').upload_to)
+        found = size = 0
+        for names, young in self.batches(
+            root, batch_size, time.time() - min_age
+        ):
+            orphans = self.orphans(names, young)
+            for name in orphans:
+                found += 1
+                size += self.storage.size(name)
+                self.stdout.write(name)
+            if not dry_run and orphans:
+                self.remove(orphans)
+        action = 'Найдено' if dry_run else (
+            'Перенесено' if quarantine else 'Удалено'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {found}, байт: {size}'
+        ))
+
+    def batches(self, root, batch_size, created_before):
+        """Файлы каталогов пачками примерно по `batch_size` и молодые из них.
+
+        Каталог всегда попадает в пачку целиком: копии лежат рядом
+        с оригиналом. Каталоги обходятся по одному, поэтому в памяти
+        не бывает больше одного каталога и одной пачки.
+        """
+        names, young = [], set()
+        for directory, subdirectories, files in os.walk(root):
+            if self.quarantine:
+                subdirectories[:] = [
+                    name for name in subdirectories
+                    if os.path.join(directory, name) != self.quarantine
+                ]
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.storage.location).replace(
+                    os.sep, '/'
+                )
+                names.append(name)
+                if os.path.getmtime(path) > created_before:
+                    # Файл мог быть загружен для ещё не сохранённого поста.
+                    young.add(name)
+            if len(names) >= batch_size:
+                yield names, young
+                names, young = [], set()
+        if names:
+            yield names, young
+
+    def orphans(self, names, young):
+        """Файлы, на которые не ссылается ни один пост.
+
+        С базой сверяется каждый файл, в том числе похожий на копию.
+        Копия (`variant_of`) сохраняется, пока нужен её оригинал.
+        """
+        kept = set(young)
+        for start in range(0, len(names), self.batch_size):
+            kept.update(Post.objects.filter(
+                image__in=names[start:start + self.batch_size]
+            ).values_list('image', flat=True))
+        originals = {os.path.splitext(name)[0] for name in kept}
+        return [
+            name for name in names
+            if name not in kept and variant_of(name) not in originals
+        ]
+
+    def remove(self, names):
+        StoredFile.objects.filter(name__in=names).delete()
+        for name in names:
+            if not self.quarantine:
+                delete_files(self.storage, name)
+                continue
+            target = os.path.join(self.quarantine, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(self.storage.path(name), target)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import PAGE_PAGINATOR
+from blog.mixin import KeysetPaginationMixin, PostQuerySetMixin
+from blog.models import Category, Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает план выполнения (EXPLAIN QUERY PLAN) запросов лент, '
+        'чтобы убедиться, что они используют индексы.'
+    )
+
+    def handle(self, *args, **options):
+        ordering = KeysetPaginationMixin.keyset_ordering
+        feed = PostQuerySetMixin().get_queryset().order_by(*ordering)
+        queries = [('Главная страница', feed)]
+
+        category = Category.objects.filter(is_published=True).first()
+        if category:
+            queries.append(
+                (f'Категория «{category}»', feed.filter(category=category))
+            )
+        author_id = Post.objects.values_list('author_id', flat=True).first()
+        if author_id:
+            queries.append(
+                ('Профиль (чужой)', feed.filter(author_id=author_id))
+            )
+            queries.append((
+                'Профиль (свой)',
+                Post.objects.filter(author_id=author_id).order_by(*ordering),
+            ))
+        post_id = Comment.objects.values_list('post_id', flat=True).first()
+        if post_id:
+            queries.append((
+                'Комментарии к посту',
+                Comment.objects.filter(post_id=post_id).order_by(
+                    'created_at', 'pk'
+                ),
+            ))
+
+        for title, queryset in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(queryset[:PAGE_PAGINATOR + 1].explain())
+            self.stdout.write('')
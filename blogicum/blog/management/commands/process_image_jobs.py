@@ -0,0 +1,57 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from blog import jobs
+from blog.constants import IMAGE_JOB_BATCH
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает изображения постов из очереди в пуле процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Число процессов; 0 — обрабатывать в текущем процессе.',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=IMAGE_JOB_BATCH,
+            help='Сколько задач забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+
+    def handle(self, *args, workers, batch, poll_interval, once, **options):
+        pool = (
+            ProcessPoolExecutor(max_workers=workers) if workers
+            else nullcontext()
+        )
+        processed = 0
+        with pool as executor:
+            while True:
+                taken = jobs.run_batch(executor, batch)
+                processed += taken
+                if taken:
+                    continue
+                if once:
+                    break
+                time.sleep(poll_interval)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано задач: {processed}')
+        )
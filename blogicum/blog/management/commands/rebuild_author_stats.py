@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog import stats
+from blog.models import User
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику авторов для страниц профиля.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Сколько пользователей пересчитывать за одну транзакцию.',
+        )
+
+    def handle(self, *args, chunk_size=500, **options):
+        last_pk = 0
+        rebuilt = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(pk__gt=last_pk).order_by(
+                    'pk'
+                ).values_list('pk', flat=True)[:chunk_size]
+            )
+            if not user_ids:
+                break
+            stats.rebuild(user_ids)
+            rebuilt += len(user_ids)
+            last_pk = user_ids[-1]
+            self.stdout.write(f'Пересчитано авторов: {rebuilt}')
+        self.stdout.write(self.style.SUCCESS(f'Готово, авторов: {rebuilt}'))
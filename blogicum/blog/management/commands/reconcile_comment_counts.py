@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не исправляя.',
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        actual = Coalesce(
+            Subquery(
+                Comment.objects.filter(
+                    post=OuterRef('pk')
+                ).order_by().values('post').annotate(
+                    total=Count('pk')
+                ).values('total')
+            ),
+            0,
+        )
+        with transaction.atomic():
+            drifted = Post.objects.annotate(
+                actual_count=actual
+            ).exclude(comment_count=F('actual_count'))
+            for post_id, stored, real in drifted.values_list(
+                'pk', 'comment_count', 'actual_count'
+            ):
+                self.stdout.write(
+                    f'Пост {post_id}: сохранено {stored}, на самом деле {real}'
+                )
+            if dry_run:
+                return
+            fixed = Post.objects.filter(
+                pk__in=drifted.values('pk')
+            ).update(comment_count=actual)
+        self.stdout.write(self.style.SUCCESS(f'Исправлено постов: {fixed}'))
@@ -0,0 +1,70 @@
+import os
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from blog.images import variant_files
+from blog.models import Post, StoredFile
+from core.storage import is_content_addressed
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def acquire(name):
+    """Учитывает ещё одну ссылку поста на файл изображения."""
+    if not is_content_addressed(name):
+        return
+    StoredFile.objects.get_or_create(name=name)
+    StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def release(name):
+    """Снимает ссылку поста на файл изображения.
+
+    Если `MEDIA_DELETE_UNUSED` включена, файл без ссылок удаляется после
+    commit; иначе его уберёт `manage.py collect_orphan_media`.
+    """
+    if is_content_addressed(name) and not StoredFile.objects.filter(
+        name=name, refcount__gt=0
+    ).update(refcount=F('refcount') - 1):
+        return
+    if settings.MEDIA_DELETE_UNUSED:
+        transaction.on_commit(lambda: collect(name))
+
+
+def collect(name):
+    """Удаляет файл и его копии, если на него больше никто не ссылается."""
+    if is_content_addressed(name):
+        if not StoredFile.objects.filter(name=name, refcount=0).delete()[0]:
+            return
+    elif Post.objects.filter(image=name).exists():
+        return
+    delete_files(image_storage(), name)
+
+
+def delete_files(storage, name):
+    """Удаляет файл и его копии, если файл не использован повторно.
+
+    Параллельная загрузка с тем же содержимым могла найти файл уже после
+    того, как его строка `StoredFile` удалена. Поэтому файл сначала
+    убирается переименованием, и только потом проверяется время его
+    изменения (`ContentAddressedStorage.touch`): файл моложе
+    `MEDIA_COLLECT_GRACE` секунд возвращается на место. Загрузка, не
+    успевшая найти файл до переименования, запишет его заново.
+    """
+    path = storage.path(name)
+    trash = f'{path}.collect'
+    try:
+        os.replace(path, trash)
+    except FileNotFoundError:
+        return
+    if time.time() - os.path.getmtime(trash) < settings.MEDIA_COLLECT_GRACE:
+        os.replace(trash, path)
+        return
+    os.remove(trash)
+    for variant in variant_files(storage, name):
+        storage.delete(variant)
@@ -0,0 +1,64 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:06
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_author_stats(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+
+    def total(queryset, field):
+        return Coalesce(Subquery(
+            queryset.filter(**{field: OuterRef('user_id')}).order_by().values(
+                field
+            ).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ), 0)
+
+    AuthorStats.objects.bulk_create(
+        AuthorStats(user_id=user_id)
+        for user_id in User.objects.values_list('pk', flat=True)
+    )
+    AuthorStats.objects.update(
+        post_count=total(Post.objects.all(), 'author'),
+        published_post_count=total(
+            Post.objects.filter(Q(is_published=True)), 'author'
+        ),
+        comment_count=total(Comment.objects.all(), 'post__author'),
+        last_post_date=Subquery(
+            Post.objects.filter(author=OuterRef('user_id')).order_by(
+                '-pub_date'
+            ).values('pub_date')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to='auth.user', verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Всего публикаций')),
+                ('published_post_count', models.PositiveIntegerField(default=0, verbose_name='Опубликованных публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев к публикациям')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата последней публикации')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
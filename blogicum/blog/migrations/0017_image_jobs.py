@@ -0,0 +1,54 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def queue_existing_images(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ImageJob = apps.get_model('blog', 'ImageJob')
+    posts = Post.objects.exclude(image='')
+    ImageJob.objects.bulk_create(
+        ImageJob(post_id=post_id, image=image)
+        for post_id, image in posts.values_list('pk', 'image').iterator()
+    )
+    posts.update(image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('', 'Нет изображения'), ('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='', editable=False, max_length=16, verbose_name='Обработка изображения'),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.CharField(max_length=256, verbose_name='Файл изображения')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Выполнено'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Для выполняемой задачи — срок, после которого её можно взять заново.', verbose_name='Не раньше')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_jobs', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'обработка изображения',
+                'verbose_name_plural': 'Обработка изображений',
+                'ordering': ('run_after', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='imagejob',
+            index=models.Index(fields=['status', 'run_after'], name='imagejob_queue_idx'),
+        ),
+        migrations.RunPython(queue_existing_images, migrations.RunPython.noop),
+    ]
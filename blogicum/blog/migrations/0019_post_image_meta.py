@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Ширина, высота, объём, формат и заглушка для загрузки.', verbose_name='Сведения об изображении'),
+        ),
+    ]
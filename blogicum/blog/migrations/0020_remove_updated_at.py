@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_image_meta'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='category',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='updated_at',
+        ),
+    ]
@@ -1,45 +1,231 @@
-from django.db.models import Count
-from django.utils import timezone
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseRedirect
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition
 from django.shortcuts import redirect
 from django.urls import reverse
 
+from blog.cache import get_versions, page_cache_key, version_key
+from blog.clock import next_publication, publication_now
+from blog.constants import PAGE_PAGINATOR
 from blog.models import Comment, Post
 from blog.forms import CommentForm, PostForm
+from blog.pagination import KeysetPaginator
+from core.retry import busy_response, call_with_retry, is_busy
+from core.routers import fresh_replica, read_from_replica
+from core.writes import WriteQueueFull, run_write
 
 
 class PostQuerySetMixin:
 
     model = Post
 
-    def get_queryset(self):
-        queryset = Post.objects.select_related(
+    def get_base_queryset(self):
+        return Post.objects.select_related(
             'author',
             'location',
             'category'
-        ).filter(
+        )
+
+    def get_published_filter(self):
+        return Q(
             is_published=True,
             category__is_published=True,
-            pub_date__lte=timezone.now()
+            pub_date__lte=publication_now()
+        )
+
+    def get_visible_filter(self, user):
+        """Пост виден автору всегда, остальным — только опубликованный."""
+        if user.is_authenticated:
+            return self.get_published_filter() | Q(author_id=user.pk)
+        return self.get_published_filter()
+
+    def get_queryset(self):
+        return self.get_base_queryset().filter(
+            self.get_published_filter()
         ).order_by('-pub_date')
-        return self.annotate_comment_count(queryset)
 
-    def annotate_comment_count(self, queryset):
-        return queryset.annotate(
-            comment_count=Count('comments')
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для страниц блога.
+
+    Валидаторы считаются без рендеринга и без запросов к базе: по версиям
+    объектов из `get_page_cache_scopes()`. Наибольшая версия служит
+    Last-Modified, но это лишь приближение: версия — момент, когда объект
+    изменился или когда ключ версии впервые появился в кэше, поэтому после
+    очистки кэша Last-Modified сдвигается вперёд. Точен только ETag.
+    Для неизменившейся страницы ответ 304 отдаётся, не доходя до шаблонов.
+    Last-Modified выставляется только анонимам: страница авторизованного
+    пользователя зависит от него самого, в том числе от CSRF-токена
+    в формах, который меняется при каждом входе, поэтому он входит в ETag.
+    """
+
+    def get_page_cache_scopes(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        keys = (version_key('site', 'all'), *self.get_page_cache_scopes())
+        versions = get_versions(keys)
+        csrf_cookie = ''
+        if request.user.is_authenticated:
+            get_token(request)
+            csrf_cookie = request.META['CSRF_COOKIE']
+        etag = hashlib.md5(':'.join(map(str, (
+            request.get_full_path(),
+            request.user.pk,
+            csrf_cookie,
+            next_publication(),
+            *(versions[key] for key in keys),
+        ))).encode()).hexdigest()
+        last_modified = None
+        if not request.user.is_authenticated:
+            last_modified = datetime.fromtimestamp(
+                max(versions.values()) / 10 ** 9, dt_timezone.utc
+            )
+        return condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )(super().dispatch)(request, *args, **kwargs)
+
+
+class AnonymousPageCacheMixin:
+    """Кэш готовых страниц для анонимных посетителей.
+
+    Ключ страницы включает версии объектов из `get_page_cache_scopes()`,
+    которые сигналы увеличивают при изменении постов, комментариев,
+    категорий, местоположений и пользователей, а также момент ближайшей
+    отложенной публикации: когда он наступает, страницы пересобираются.
+    """
+
+    def get_page_cache_scopes(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        page_cache = caches[settings.PAGE_CACHE_ALIAS]
+        key = page_cache_key(
+            request.get_full_path(),
+            self.get_page_cache_scopes(),
+            next_publication(),
+        )
+        cached = page_cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: page_cache.set(
+                    key,
+                    (rendered.content, rendered['Content-Type']),
+                    settings.PAGE_CACHE_TIMEOUT,
+                )
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """Читает данные страницы с копии базы, если копия свежая.
+
+    Копия годится, если её снимок сделан позже последнего изменения
+    объектов из `get_page_cache_scopes()` — тех же версий, по которым
+    считается ETag. Страница рендерится внутри блока, чтобы ленивые
+    запросы шаблона тоже шли в копию. Пользователь сразу после своей
+    записи (`request.pinned_to_primary`) и на своих страницах
+    (`reads_own_data()`) читает с основной базы.
+    """
+
+    def get_page_cache_scopes(self):
+        return ()
+
+    def reads_own_data(self):
+        return False
+
+    def get_replica(self, request):
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method not in ('GET', 'HEAD')
+            or getattr(request, 'pinned_to_primary', False)
+            or self.reads_own_data()
+        ):
+            return None
+        keys = (version_key('site', 'all'), *self.get_page_cache_scopes())
+        return fresh_replica(max(get_versions(keys).values()) / 10 ** 9)
+
+    def dispatch(self, request, *args, **kwargs):
+        alias = self.get_replica(request)
+        if alias is None:
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica(alias):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация ленты по (pub_date, id).
+
+    Ссылки на страницы содержат непрозрачные курсоры `?after=`/`?before=`,
+    поэтому глубокие страницы стоят столько же, сколько первая, и запрос
+    COUNT(*) не выполняется. Если `numbered_pages` включён, запрос с
+    `?page=` обслуживается обычной нумерованной пагинацией.
+    """
+
+    paginate_by = PAGE_PAGINATOR
+    keyset_ordering = ('-pub_date', '-pk')
+    numbered_pages = False
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.numbered_pages and self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(
+                queryset.order_by(*self.keyset_ordering), page_size
+            )
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
         )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AuthorOnlyMixin:
+    """Изменять объект может только его автор.
+
+    Объект загружается один раз за запрос и переиспользуется в `dispatch`,
+    `get` и `post`; авторство проверяется по `author_id` той же строки.
+    """
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.get_object().author_id != request.user.pk:
+            return redirect('blog:post_detail', self.kwargs['post_id'])
+        return super().dispatch(request, *args, **kwargs)
 
 
-class CommentMixin:
+class CommentMixin(AuthorOnlyMixin):
 
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect('blog:post_detail', self.get_object().id)
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
 
     def get_success_url(self):
         return reverse(
@@ -48,14 +234,32 @@ class CommentMixin:
         )
 
 
-class PostMixin:
+class PostMixin(AuthorOnlyMixin):
 
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != self.request.user:
-            return redirect('blog:post_detail', self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
+
+class QueuedWriteMixin:
+    """Сохраняет форму через очередь записи (см. `core.writes`).
+
+    Запись повторяется при блокировке базы сама, поэтому
+    `BusyRetryMiddleware` такие представления пропускает. Если очередь
+    переполнена, не успела выполнить запись или попытки кончились,
+    отвечает 503 с просьбой повторить запрос.
+    """
+
+    busy_retry = False
+
+    def form_valid(self, form):
+        try:
+            self.object = run_write(call_with_retry, form.save)
+        except WriteQueueFull:
+            return busy_response()
+        except OperationalError as error:
+            if not is_busy(error):
+                raise
+            return busy_response()
+        return HttpResponseRedirect(self.get_success_url())
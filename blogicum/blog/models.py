@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 from blog import constants
 from core.models import PublishedModel
+from core.storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -50,6 +52,13 @@ class Category(PublishedModel):
         return self.title[:constants.RECORDS_LIMIT]
 
 
+class ImageStatus(models.TextChoices):
+    NONE = '', 'Нет изображения'
+    PENDING = 'pending', 'Обрабатывается'
+    READY = 'ready', 'Готово'
+    FAILED = 'failed', 'Ошибка обработки'
+
+
 class Post(PublishedModel):
     title = models.CharField(
         'Заголовок',
@@ -88,7 +97,28 @@ class Post(PublishedModel):
     image = models.ImageField(
         'Изображение',
         upload_to='post_images',
+        storage=ContentAddressedStorage(),
+        blank=True,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    image_status = models.CharField(
+        'Обработка изображения',
+        max_length=16,
+        choices=ImageStatus.choices,
+        default=ImageStatus.NONE,
+        blank=True,
+        editable=False,
+    )
+    image_meta = models.JSONField(
+        'Сведения об изображении',
+        default=dict,
         blank=True,
+        editable=False,
+        help_text='Ширина, высота, объём, формат и заглушка для загрузки.'
     )
 
     class Meta:
@@ -96,6 +126,30 @@ class Post(PublishedModel):
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date', 'title')
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date', '-id'),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'is_published', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_partial_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_partial_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title[:constants.RECORDS_LIMIT]
@@ -103,6 +157,15 @@ class Post(PublishedModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.pk})
 
+    @property
+    def image_ready(self):
+        """Изображение можно показывать: метаданные удалены, копии готовы.
+
+        До этого по адресу файла лежит исходная загрузка со всеми EXIF
+        и координатами, поэтому ссылки на неё не выводятся.
+        """
+        return bool(self.image) and self.image_status == ImageStatus.READY
+
 
 class Comment(PublishedModel):
     text = models.TextField(
@@ -124,7 +187,127 @@ class Comment(PublishedModel):
         verbose_name_plural = 'Коментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return (f'Комментарий {self.author} к посту "{self.post}", '
                 f'текст: {self.text[:constants.RECORDS_LIMIT]}')
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='author_stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField(
+        'Всего публикаций',
+        default=0
+    )
+    published_post_count = models.PositiveIntegerField(
+        'Опубликованных публикаций',
+        default=0
+    )
+    comment_count = models.PositiveIntegerField(
+        'Комментариев к публикациям',
+        default=0
+    )
+    last_post_date = models.DateTimeField(
+        'Дата последней публикации',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self) -> str:
+        return f'Статистика {self.user}'
+
+
+class ImageJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнено'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация'
+    )
+    image = models.CharField(
+        'Файл изображения',
+        max_length=constants.MAX_LENGTH
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток',
+        default=0
+    )
+    run_after = models.DateTimeField(
+        'Не раньше',
+        default=timezone.now,
+        help_text='Для выполняемой задачи — срок, после которого её'
+        ' можно взять заново.'
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='imagejob_queue_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class StoredFile(models.Model):
+    name = models.CharField(
+        'Имя файла',
+        max_length=constants.MAX_LENGTH,
+        unique=True
+    )
+    refcount = models.PositiveIntegerField(
+        'Количество ссылок',
+        default=0
+    )
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.refcount})'
@@ -0,0 +1,140 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации.
+
+    Повторяет интерфейс `django.core.paginator.Page`, который используют
+    шаблоны, но вместо номеров страниц отдаёт непрозрачные курсоры.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки без OFFSET и без COUNT(*).
+
+    Стоимость любой страницы одинакова: запрос выбирает `per_page + 1`
+    записей, начиная с курсора, по индексу на полях сортировки.
+    Последнее поле сортировки должно быть уникальным (обычно `pk`).
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = [
+            self._get_field(name).value_to_string(obj)
+            if name != 'pk' else str(obj.pk)
+            for name in self.fields
+        ]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                self._get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise Http404('Некорректный курсор страницы')
+
+    def page(self, after=None, before=None):
+        if before:
+            rows = list(
+                self.queryset.filter(
+                    self._seek(self.decode_cursor(before), reverse=True)
+                ).order_by(
+                    *self._reversed_ordering()
+                )[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            # Дальше есть строки, только если эта страница не пуста:
+            # курсор «вперёд» берётся с её последней строки.
+            return KeysetPage(rows, self, bool(rows), has_previous)
+
+        queryset = self.queryset.order_by(*self.ordering)
+        if after:
+            queryset = queryset.filter(self._seek(self.decode_cursor(after)))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(
+            rows[:self.per_page], self, has_next, bool(after and rows)
+        )
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def _seek(self, values, reverse=False):
+        """Условие «строго после курсора» в порядке сортировки."""
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            equal = {
+                field: value for field, value
+                in zip(self.fields[:index], values[:index])
+            }
+            condition |= Q(
+                **equal, **{f'{self.fields[index]}__{lookup}': values[index]}
+            )
+        return condition
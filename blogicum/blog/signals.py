@@ -0,0 +1,213 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from blog import jobs, media, stats
+from blog.cache import bump_feed_pages, bump_version, forget_profiles
+from blog.clock import schedule_publication
+from blog.images import describe
+from blog.models import (
+    AuthorStats, Category, Comment, ImageStatus, Location, Post, User
+)
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def bump_post_pages(*post_ids):
+    """Сбрасывает страницы постов и ленты, где видны их счётчики."""
+    for post_id in post_ids:
+        bump_version('post', post_id)
+    posts = Post.objects.filter(pk__in=post_ids).values_list(
+        'category_id', 'author_id'
+    )
+    bump_feed_pages(
+        {category_id for category_id, _ in posts},
+        {author_id for _, author_id in posts},
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    """Запоминает прежний пост комментария, если его перенесли."""
+    instance._previous_post_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_post_id = Comment.objects.filter(
+            pk=instance.pk
+        ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+        stats.change_comment_total(instance.post_id, 1)
+        bump_post_pages(instance.post_id)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+        stats.change_comment_total(previous_post_id, -1)
+        stats.change_comment_total(instance.post_id, 1)
+        bump_post_pages(previous_post_id, instance.post_id)
+    else:
+        bump_version('post', instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+    stats.change_comment_total(instance.post_id, -1)
+    bump_post_pages(instance.post_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_placement(sender, instance, raw=False, **kwargs):
+    """Запоминает прежние категорию, автора, публикацию и картинку поста."""
+    instance._previous_placement = (None, None)
+    instance._previous_publication = None
+    instance._previous_image = None
+    if not raw and not instance._state.adding:
+        previous = Post.objects.filter(pk=instance.pk).values_list(
+            'category_id', 'author_id', 'is_published', 'pub_date',
+            'comment_count', 'image'
+        ).first()
+        if previous:
+            instance._previous_placement = previous[:2]
+            instance._previous_publication = previous[2:5]
+            instance._previous_image = previous[5]
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    previous_category_id, previous_author_id = getattr(
+        instance, '_previous_placement', (None, None)
+    )
+    bump_version('post', instance.pk)
+    bump_feed_pages(
+        {instance.category_id, previous_category_id},
+        {instance.author_id, previous_author_id},
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_stats_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.add_post(instance.author_id, instance.is_published)
+        return
+    previous = getattr(instance, '_previous_publication', None)
+    if previous is None:
+        return
+    was_published, previous_pub_date, comment_count = previous
+    previous_author_id = instance._previous_placement[1]
+    if previous_author_id != instance.author_id:
+        stats.remove_post(previous_author_id, was_published, comment_count)
+        stats.add_post(
+            instance.author_id, instance.is_published, comment_count
+        )
+    else:
+        stats.update_post(
+            instance.author_id, was_published, instance.is_published,
+            previous_pub_date != instance.pub_date,
+        )
+
+
+@receiver(post_delete, sender=Post)
+def post_stats_deleted(sender, instance, **kwargs):
+    # Комментарии удаляются каскадом раньше поста и уже вычтены.
+    stats.remove_post(instance.author_id, instance.is_published)
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_status(sender, instance, raw=False, **kwargs):
+    """Для нового изображения сразу сохраняет сведения из его заголовка."""
+    if raw or getattr(instance, '_image_processed', False) or (
+        instance.image.name == getattr(instance, '_previous_image', None)
+    ):
+        return
+    instance.image_status = (
+        ImageStatus.PENDING if instance.image else ImageStatus.NONE
+    )
+    instance.image_meta = describe(instance.image) if instance.image else {}
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw=False, **kwargs):
+    previous_image = getattr(instance, '_previous_image', None)
+    if raw or instance.image.name == previous_image:
+        return
+    if instance.image:
+        media.acquire(instance.image.name)
+        if not getattr(instance, '_image_processed', False):
+            jobs.enqueue(instance)
+    if previous_image:
+        media.release(previous_image)
+
+
+@receiver(post_delete, sender=Post)
+def post_image_deleted(sender, instance, **kwargs):
+    if instance.image:
+        media.release(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def post_scheduled(sender, instance, **kwargs):
+    schedule_publication(instance.pub_date)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_version('category', instance.pk)
+    bump_version('site', 'all')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    bump_version('location', instance.pk)
+    bump_version('site', 'all')
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+def only_last_login(update_fields):
+    return update_fields and set(update_fields) <= {'last_login'}
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    """Запоминает прежний username, чтобы сбросить кэш и старого профиля."""
+    instance._previous_username = None
+    if not raw and not instance._state.adding and not only_last_login(
+        update_fields
+    ):
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, created=False, update_fields=None,
+                 **kwargs):
+    if created or only_last_login(update_fields):
+        return
+    forget_profiles(*filter(None, {
+        instance.username, getattr(instance, '_previous_username', None)
+    }))
+    bump_version('user', instance.pk)
+    bump_version('site', 'all')
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+
+from blog.models import AuthorStats, Comment, Post
+
+
+def last_post_date():
+    return Subquery(
+        Post.objects.filter(
+            author_id=OuterRef('user_id')
+        ).order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def add_post(author_id, is_published, comment_count=0):
+    if author_id is None:
+        return
+    AuthorStats.objects.get_or_create(user_id=author_id)
+    AuthorStats.objects.filter(user_id=author_id).update(
+        post_count=F('post_count') + 1,
+        published_post_count=F('published_post_count') + int(is_published),
+        comment_count=F('comment_count') + comment_count,
+        last_post_date=last_post_date(),
+    )
+
+
+def remove_post(author_id, is_published, comment_count=0):
+    if author_id is None:
+        return
+    AuthorStats.objects.filter(user_id=author_id).update(
+        post_count=F('post_count') - 1,
+        published_post_count=F('published_post_count') - int(is_published),
+        comment_count=F('comment_count') - comment_count,
+        last_post_date=last_post_date(),
+    )
+
+
+def update_post(author_id, was_published, is_published, pub_date_changed):
+    if author_id is None or (
+        was_published == is_published and not pub_date_changed
+    ):
+        return
+    AuthorStats.objects.filter(user_id=author_id).update(
+        published_post_count=(
+            F('published_post_count') + int(is_published) - int(was_published)
+        ),
+        last_post_date=last_post_date(),
+    )
+
+
+def change_comment_total(post_id, delta):
+    AuthorStats.objects.filter(
+        user_id=Subquery(
+            Post.objects.filter(pk=post_id).values('author_id')[:1]
+        )
+    ).update(comment_count=F('comment_count') + delta)
+
+
+def rebuild(user_ids):
+    """Пересчитывает статистику авторов из `user_ids` с нуля."""
+    posts = {
+        row['author_id']: row for row in Post.objects.filter(
+            author_id__in=user_ids
+        ).order_by().values('author_id').annotate(
+            total=Count('pk'),
+            published=Count('pk', filter=Q(is_published=True)),
+            last=Max('pub_date'),
+        )
+    }
+    comments = dict(
+        Comment.objects.filter(
+            post__author_id__in=user_ids
+        ).order_by().values('post__author_id').annotate(
+            total=Count('pk')
+        ).values_list('post__author_id', 'total')
+    )
+    stats = [
+        AuthorStats(
+            user_id=user_id,
+            post_count=posts.get(user_id, {}).get('total', 0),
+            published_post_count=posts.get(user_id, {}).get('published', 0),
+            comment_count=comments.get(user_id, 0),
+            last_post_date=posts.get(user_id, {}).get('last'),
+        )
+        for user_id in user_ids
+    ]
+    with transaction.atomic():
+        existing = set(AuthorStats.objects.filter(
+            user_id__in=user_ids
+        ).values_list('user_id', flat=True))
+        AuthorStats.objects.bulk_create(
+            [item for item in stats if item.user_id not in existing]
+        )
+        AuthorStats.objects.bulk_update(
+            [item for item in stats if item.user_id in existing],
+            (
+                'post_count', 'published_post_count', 'comment_count',
+                'last_post_date',
+            ),
+        )
@@ -0,0 +1,89 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from blog.cache import post_card_key
+from blog.constants import (
+    IMAGE_SIZES, IMAGE_VARIANTS, PENDING_IMAGE_SRC, POST_CARD_TIMEOUT
+)
+from blog.images import image_sources, scaled_size
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Карточки постов ленты из кэша фрагментов.
+
+    Готовые карточки берутся из кэша одним обращением по ключам из данных
+    самих постов (см. `post_card_key`), а шаблон карточки рендерится
+    только для изменившихся постов.
+    """
+    posts = list(posts)
+    keys = [post_card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    rendered = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            rendered[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+    if rendered:
+        cache.set_many(rendered, POST_CARD_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+@register.simple_tag
+def post_image(post, variant, css_class=''):
+    """`<picture>` изображения поста с копиями в WebP и формате оригинала.
+
+    Размеры и заглушка берутся из `Post.image_meta`, файл не открывается.
+    Карточки ленты загружаются лениво. Пока изображение не обработано
+    (`Post.image_ready`), вместо него выводится пустая рамка его размера:
+    исходная загрузка ещё содержит метаданные.
+    """
+    meta = post.image_meta or {}
+    loading = 'lazy' if variant == 'card' else 'eager'
+    if not post.image_ready:
+        return pending_image(post, variant, meta, css_class)
+    try:
+        sources = image_sources(post.image, variant, meta)
+    except (OSError, ValueError, TypeError):
+        return format_html(
+            '<img class="{}" src="{}" loading="{}" alt="">',
+            css_class, post.image.url, loading,
+        )
+    style = ''
+    if meta.get('lqip'):
+        style = format_html(
+            ' style="background: url({}) center / cover"', meta['lqip']
+        )
+    img = format_html(
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" width="{}"'
+        ' height="{}" loading="{}" decoding="async"{} alt="">',
+        css_class, sources['src'], sources['srcset'], IMAGE_SIZES[variant],
+        sources['width'], sources['height'], loading, style,
+    )
+    if not sources['webp_srcset']:
+        return img
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">{}'
+        '</picture>',
+        sources['webp_srcset'], IMAGE_SIZES[variant], img,
+    )
+
+
+def pending_image(post, variant, meta, css_class):
+    size = ''
+    if 'width' in meta:
+        size = format_html(' width="{}" height="{}"', *scaled_size(
+            (meta['width'], meta['height']),
+            min(IMAGE_VARIANTS[variant][0], meta['width']),
+        ))
+    return format_html(
+        '<img class="{}" src="{}"{} alt="{}">',
+        css_class, PENDING_IMAGE_SRC, size, post.get_image_status_display(),
+    )
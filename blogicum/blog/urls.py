@@ -25,6 +25,11 @@ urlpatterns = [
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
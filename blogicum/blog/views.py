@@ -1,67 +1,86 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
-from django.utils import timezone
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
 
-from blog.constants import PAGE_PAGINATOR
+from blog.constants import COMMENTS_PAGINATOR
 from blog.forms import CommentForm, PostForm, ProfileForm
-from blog.mixin import CommentMixin, PostMixin, PostQuerySetMixin
-from blog.models import Category, Comment, Post, User
+from blog.cache import forget_profiles, get_profile, version_key
+from blog.mixin import (
+    AnonymousPageCacheMixin, CommentMixin, ConditionalGetMixin,
+    KeysetPaginationMixin, PostMixin, PostQuerySetMixin, QueuedWriteMixin,
+    ReplicaReadMixin
+)
+from blog.models import AuthorStats, Category, Comment, Post, User
+from blog.pagination import KeysetPaginator
 
 
-class IndexListView(PostQuerySetMixin, ListView):
+class IndexListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    KeysetPaginationMixin, PostQuerySetMixin, ListView
+):
     """Главная страница"""
 
-    paginate_by = PAGE_PAGINATOR
     template_name = 'blog/index.html'
 
+    def get_page_cache_scopes(self):
+        return (version_key('feed', 'index'),)
+
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    PostQuerySetMixin, DetailView
+):
     """Страница отдельного поста"""
 
-    model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def get_object(self, queryset=None):
-        object = super().get_object(
-            self.model.objects.select_related(
-                'location', 'category', 'author'
-            ),
+    def get_page_cache_scopes(self):
+        return (version_key('post', self.kwargs['post_id']),)
+
+    def get_queryset(self):
+        return self.get_base_queryset().filter(
+            self.get_visible_filter(self.request.user)
         )
-        if object.author != self.request.user:
-            return get_object_or_404(
-                self.model.objects.select_related(
-                    'location', 'category', 'author'
-                ).filter(
-                    pub_date__lte=timezone.now(),
-                    category__is_published=True,
-                    is_published=True
-                ),
-                pk=self.kwargs['post_id']
-            )
-        return object
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related(
-                'author'
-            ).order_by('created_at')
-        )
+        context['comments'] = KeysetPaginator(
+            self.object.comments.select_related('author'),
+            COMMENTS_PAGINATOR,
+            ('created_at', 'pk'),
+        ).page(after=self.request.GET.get('after'))
         return context
 
 
-class CategoryListView(PostQuerySetMixin, ListView):
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев к посту для подгрузки"""
+
+    template_name = 'includes/comment_list.html'
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(None).only(
+            'pk', 'author_id'
+        )
+
+
+class CategoryListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    KeysetPaginationMixin, PostQuerySetMixin, ListView
+):
     """Страница отдельной категории."""
 
     template_name = 'blog/category.html'
     category = None
-    paginate_by = PAGE_PAGINATOR
+    numbered_pages = True
+
+    def get_page_cache_scopes(self):
+        return (version_key('category_slug', self.kwargs['category_slug']),)
 
     def get_queryset(self):
         self.category = get_object_or_404(
@@ -79,30 +98,49 @@ class CategoryListView(PostQuerySetMixin, ListView):
         return context
 
 
-class ProfileListView(PostQuerySetMixin, ListView):
+class ProfileListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    KeysetPaginationMixin, PostQuerySetMixin, ListView
+):
     """Страница профиля пользователя"""
 
     model = Post
     template_name = 'blog/profile.html'
-    paginate_by = PAGE_PAGINATOR
+    author = None
+
+    def get_page_cache_scopes(self):
+        return (version_key('username', self.kwargs['username']),)
+
+    def reads_own_data(self):
+        return self.request.user.username == self.kwargs['username']
+
+    def get_author(self):
+        if self.author is None:
+            self.author = get_profile(self.kwargs['username'])
+            if self.author is None:
+                raise Http404('Пользователь не найден')
+        return self.author
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = User.objects.get(username=self.kwargs['username'])
+        context['profile'] = self.get_author()
+        # Счётчики учитывают черновики, отложенные посты и скрытые
+        # категории, поэтому видны только самому автору.
+        if self.request.user.pk == context['profile'].pk:
+            context['stats'] = AuthorStats.objects.filter(
+                user_id=context['profile'].pk
+            ).first()
         return context
 
     def get_queryset(self):
-        self.author = get_object_or_404(User, username=self.kwargs['username'])
-        if self.request.user == self.author:
-            return self.annotate_comment_count(
-                Post.objects.select_related(
-                    'location', 'category', 'author'
-                ).filter(
-                    author=self.author
-                ).order_by('-pub_date'))
+        author = self.get_author()
+        if self.request.user.pk == author.pk:
+            return self.get_base_queryset().filter(
+                author_id=author.pk
+            ).order_by('-pub_date')
 
         return super().get_queryset().filter(
-            author=self.author
+            author_id=author.pk
         )
 
 
@@ -114,8 +152,14 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'blog/user.html'
 
     def get_object(self):
+        self.previous_username = self.request.user.username
         return self.request.user
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        forget_profiles(self.previous_username, self.object.username)
+        return response
+
     def get_success_url(self):
         return reverse(
             'blog:profile',
@@ -123,7 +167,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(LoginRequiredMixin, QueuedWriteMixin, CreateView):
     """Страница написания поста"""
 
     model = Post
@@ -146,16 +190,6 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 class PostUpdateView(LoginRequiredMixin, PostMixin, UpdateView):
     """Редактирование поста"""
 
-    def test_func(self):
-        return self.get_object().author == self.request.user
-
-    def handle_no_permission(self):
-        post = self.get_object()
-        return redirect('blog:post_detail', post.pk)
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(self.model, pk=self.kwargs[self.pk_url_kwarg])
-
     def get_success_url(self):
         return reverse('blog:post_detail', args=[self.object.pk])
 
@@ -172,14 +206,23 @@ class PostDeleteView(LoginRequiredMixin, PostMixin, DeleteView):
         return context
 
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
+class CommentCreateView(
+    LoginRequiredMixin, PostQuerySetMixin, QueuedWriteMixin, CreateView
+):
     """Страница написания комментария"""
 
     model = Comment
     form_class = CommentForm
-    posts = None
     pk_url_kwarg = 'post_id'
 
+    def post(self, request, *args, **kwargs):
+        # Строка поста не загружается: достаточно проверки по индексу.
+        if not Post.objects.filter(
+            self.get_visible_filter(request.user), pk=kwargs['post_id']
+        ).exists():
+            raise Http404('Публикация не найдена')
+        return super().post(request, *args, **kwargs)
+
     def get_success_url(self):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
@@ -187,7 +230,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
+        form.instance.post_id = self.kwargs['post_id']
         return super().form_valid(form)
 
 
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -29,6 +30,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.routers.ReplicaPinMiddleware',
+    'core.retry.BusyRetryMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -54,13 +57,105 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
+# Соединение с прагмами живёт в потоке воркера CONN_MAX_AGE секунд
+# и переиспользуется; перед каждым запросом оно проверяется
+# (см. core/db.py). Сервер разработки создаёт поток на запрос,
+# поэтому там соединения всё равно новые.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# Заголовок Server-Timing с временем подключения, запросов к базе
+# и всего ответа (см. core/timing.py).
+SERVER_TIMING = DEBUG
+
+# Копии базы только для чтения — алиасы из DATABASES, например:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'db.replica.sqlite3',
+#     'CONN_MAX_AGE': 600,
+# }
+# DATABASE_REPLICAS = ['replica']
+# Локально копию обновляет `manage.py sync_replicas` (см. core/routers.py).
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_SYNC_INTERVAL = 5
+
+# Копия старше стольких секунд не используется.
+REPLICA_MAX_LAG = 30
+
+# Сколько секунд после своей записи пользователь читает с основной базы.
+REPLICA_PIN_SECONDS = 10
+
+# Выполняются на каждом новом соединении с SQLite (см. core/db.py).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+# Короткие записи из запросов (комментарии, посты) выполняет один поток
+# процесса, группируя их по WRITE_QUEUE_BATCH в одну транзакцию.
+WRITE_QUEUE_ENABLED = False
+
+WRITE_QUEUE_SIZE = 256
+
+WRITE_QUEUE_BATCH = 32
+
+# Сколько секунд ждать места в очереди, прежде чем ответить 503.
+WRITE_QUEUE_TIMEOUT = 2
+
+# Сколько секунд запрос ждёт выполнения своей записи, прежде чем
+# ответить 503.
+WRITE_QUEUE_RESULT_TIMEOUT = 10
+
+# Изменяющий запрос, упавший с `database is locked`, повторяется целиком
+# до DB_RETRY_ATTEMPTS раз (0 — не повторять) со случайной паузой
+# до DB_RETRY_BASE_DELAY * 2**попытка, но не дольше DB_RETRY_MAX_DELAY,
+# и не дольше DB_RETRY_BUDGET секунд на все попытки (см. core/retry.py).
+DB_RETRY_ATTEMPTS = 4
+
+DB_RETRY_BASE_DELAY = 0.05
+
+DB_RETRY_MAX_DELAY = 1
+
+DB_RETRY_BUDGET = 3
+
+
+# Версии объектов, расписание публикаций и профили в кэше `default`
+# сбрасываются сигналами в том процессе, который выполнил запись, поэтому
+# этот кэш обязан быть общим для всех процессов: иначе остальные воркеры
+# отдают устаревшие страницы, 304 на старые ETag и читают отставшие копии
+# базы. Файловый кэш общий для процессов одной машины; на нескольких
+# машинах нужен memcached или redis. Ключи страниц в `pages` содержат
+# версии из `default`, поэтому сам `pages` может быть локальным.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-pages',
+    },
+}
+
+PAGE_CACHE_ALIAS = 'pages'
+
+PAGE_CACHE_TIMEOUT = 60
+
+PUBLICATION_CLOCK_BUCKET = 30
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -96,6 +191,33 @@ STATICFILES_DIRS = [
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.ImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Файлы крупнее держатся не в памяти, а во временных файлах.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
+# Копии изображений готовит `manage.py process_image_jobs`;
+# при False они создаются прямо в запросе, сохраняющем пост.
+IMAGE_JOBS_ASYNC = True
+
+# Удалять изображение, как только на него не осталось ссылок постов.
+# При False файлы убирает `manage.py collect_orphan_media`.
+MEDIA_DELETE_UNUSED = True
+
+# Файл, изменённый или повторно загруженный менее стольких секунд назад,
+# не удаляется сразу: его уберёт `manage.py collect_orphan_media`.
+MEDIA_COLLECT_GRACE = 60
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
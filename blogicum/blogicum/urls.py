@@ -5,9 +5,12 @@ from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import include, path, reverse_lazy
 
+from core.views import db_retry_stats, serve_media
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('status/db-retries/', db_retry_stats, name='db_retry_stats'),
     path('pages/', include('pages.urls', namespace='pages')),
     path(
         'auth/registration/',
@@ -23,9 +26,7 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media)
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
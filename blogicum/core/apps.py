@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import checks  # noqa: F401
+        from core.db import (
+            apply_pragmas, check_connections, remember_inode, report_pragmas
+        )
+        connection_created.connect(apply_pragmas)
+        connection_created.connect(report_pragmas)
+        connection_created.connect(remember_inode)
+        request_started.connect(check_connections)
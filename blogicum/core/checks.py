@@ -0,0 +1,35 @@
+from django.core.checks import Info, Tags, Warning, register
+from django.db import connections
+
+from core.db import format_pragmas, pragma_mismatches, read_pragmas
+
+
+@register(Tags.database)
+def check_sqlite_pragmas(app_configs=None, databases=None, **kwargs):
+    """Сообщает, с какими прагмами на самом деле работает SQLite.
+
+    Проверка обращается к базе, поэтому выполняется только в `migrate`
+    и `check --database`; при запуске сервера прагмы пишет в лог
+    `core.db.report_pragmas`.
+    """
+    messages = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        effective = read_pragmas(connection)
+        messages.append(Info(
+            f'SQLite «{alias}»: {format_pragmas(effective)}',
+            id='core.I001',
+        ))
+        for name, (expected, actual) in pragma_mismatches(
+            connection
+        ).items():
+            messages.append(Warning(
+                f'SQLite «{alias}»: PRAGMA {name} = {actual},'
+                f' а в SQLITE_PRAGMAS указано {expected}.',
+                hint='Проверьте, что файл базы доступен на запись и'
+                ' файловая система поддерживает WAL.',
+                id='core.W001',
+            ))
+    return messages
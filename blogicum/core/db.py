@@ -0,0 +1,177 @@
+import logging
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Значения, которые SQLite возвращает вместо названий режимов.
+PRAGMA_NAMES = {
+    'synchronous': {0: 'off', 1: 'normal', 2: 'full', 3: 'extra'},
+    'temp_store': {0: 'default', 1: 'file', 2: 'memory'},
+}
+# Для базы в памяти WAL недоступен, SQLite оставляет режим `memory`.
+IN_MEMORY_JOURNAL = 'memory'
+
+# Базы, о прагмах которых процесс уже сообщил в лог.
+_reported = set()
+
+
+def normalize(name, value):
+    value = PRAGMA_NAMES.get(name, {}).get(value, value)
+    return str(value).lower()
+
+
+def pragmas_for(alias):
+    """Прагмы соединения `alias`.
+
+    Копия для чтения (`DATABASE_REPLICAS`) не переводится в WAL: её файл
+    целиком заменяет `manage.py sync_replicas`. Запись в неё запрещена.
+    """
+    if alias not in settings.DATABASE_REPLICAS:
+        return settings.SQLITE_PRAGMAS
+    pragmas = {
+        name: value for name, value in settings.SQLITE_PRAGMAS.items()
+        if name != 'journal_mode'
+    }
+    pragmas['query_only'] = 1
+    return pragmas
+
+
+def pragma_statements(pragmas=None):
+    if pragmas is None:
+        pragmas = settings.SQLITE_PRAGMAS
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite по `SQLITE_PRAGMAS`."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas_for(connection.alias)):
+            cursor.execute(statement)
+
+
+def remember_inode(sender, connection, **kwargs):
+    """Запоминает файл, который открыло соединение с SQLite."""
+    if connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+        connection.database_inode = os.stat(
+            connection.settings_dict['NAME']
+        ).st_ino
+
+
+def connection_alive(connection):
+    """Дешёвая проверка, что сохранённое соединение можно переиспользовать.
+
+    Для SQLite соединение устаревает, когда файл базы подменили — например,
+    `sync_replicas` обновил копию: старое соединение продолжало бы читать
+    прежний файл.
+    """
+    if connection.vendor != 'sqlite':
+        return connection.is_usable()
+    inode = getattr(connection, 'database_inode', None)
+    if inode is None:
+        return True
+    try:
+        return os.stat(connection.settings_dict['NAME']).st_ino == inode
+    except OSError:
+        return False
+
+
+def check_connections(**kwargs):
+    """Закрывает сохранённые соединения, не прошедшие `connection_alive`.
+
+    Подключается к `request_started` вслед за `close_old_connections`,
+    которая закрывает соединения старше `CONN_MAX_AGE`.
+    """
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection_alive(connection)
+        ):
+            connection.close()
+
+
+def read_pragmas(connection):
+    """Действующие значения прагм из `pragmas_for()`.
+
+    None — прагма к этой базе неприменима (например, `mmap_size`
+    для базы в памяти).
+    """
+    with connection.cursor() as cursor:
+        effective = {}
+        for name in pragmas_for(connection.alias):
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            effective[name] = row and normalize(name, row[0])
+    return effective
+
+
+def pragma_mismatches(connection):
+    """Прагмы, которые SQLite не приняла: `{имя: (ожидалось, есть)}`."""
+    effective = read_pragmas(connection)
+    mismatches = {}
+    for name, value in pragmas_for(connection.alias).items():
+        expected = normalize(name, value)
+        if effective[name] is None or (
+            name == 'journal_mode' and effective[name] == IN_MEMORY_JOURNAL
+        ):
+            continue
+        if effective[name] != expected:
+            mismatches[name] = (expected, effective[name])
+    return mismatches
+
+
+def format_pragmas(effective):
+    return ', '.join(f'{name}={value}' for name, value in effective.items())
+
+
+def report_pragmas(sender, connection, **kwargs):
+    """Пишет в лог прагмы первого соединения процесса с каждой базой.
+
+    Проверка `check_sqlite_pragmas` обращается к базе и поэтому
+    не выполняется при запуске сервера; вместо неё процесс сообщает
+    о прагмах здесь, а о непринятых SQLite — предупреждением.
+    """
+    if connection.vendor != 'sqlite' or connection.alias in _reported:
+        return
+    _reported.add(connection.alias)
+    logger.info(
+        'SQLite «%s»: %s',
+        connection.alias, format_pragmas(read_pragmas(connection)),
+    )
+    for name, (expected, actual) in pragma_mismatches(connection).items():
+        logger.warning(
+            'SQLite «%s»: PRAGMA %s = %s, а в SQLITE_PRAGMAS указано %s.',
+            connection.alias, name, actual, expected,
+        )
+
+
+def copy_database(source, target):
+    """Копирует базу SQLite через online backup API.
+
+    Копия пишется во временный файл и подменяет `target` одним
+    переименованием, поэтому читатели видят либо старую копию, либо
+    новую целиком. Время изменения файла — момент начала снимка.
+    """
+    temporary = f'{target}.sync'
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    started = time.time()
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(temporary)
+    try:
+        source_connection.backup(target_connection)
+        # Копию только читают, отдельный WAL-файл ей не нужен.
+        target_connection.execute('PRAGMA journal_mode = delete')
+    finally:
+        target_connection.close()
+        source_connection.close()
+    os.utime(temporary, (started, started))
+    os.replace(temporary, target)
+    return started
@@ -0,0 +1,116 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.db import pragma_statements
+
+SCHEMA = (
+    'CREATE TABLE comment ('
+    'id INTEGER PRIMARY KEY, post_id INTEGER NOT NULL, text TEXT NOT NULL)',
+    'CREATE INDEX comment_post_idx ON comment (post_id, id)',
+)
+WRITE = 'INSERT INTO comment (post_id, text) VALUES (?, ?)'
+READ = (
+    'SELECT id, text FROM comment WHERE post_id = ? '
+    'ORDER BY id DESC LIMIT 20'
+)
+POSTS = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость записи и чтения SQLite с настройками'
+        ' по умолчанию и с SQLITE_PRAGMAS.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writes',
+            type=int,
+            default=500,
+            help='Число записей (по транзакции на запись) на поток.',
+        )
+        parser.add_argument(
+            '--reads',
+            type=int,
+            default=2000,
+            help='Число чтений на поток.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Число параллельных потоков.',
+        )
+
+    def handle(self, *args, writes, reads, threads, **options):
+        self.stdout.write(
+            f'{"Настройки":<16}{"запись, оп/с":>14}{"ошибок":>9}'
+            f'{"чтение, оп/с":>14}'
+        )
+        for title, statements in (
+            ('по умолчанию', []),
+            ('SQLITE_PRAGMAS', pragma_statements()),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.setup(path, statements)
+                write_rate, errors = self.measure(
+                    path, statements, threads, writes, self.write
+                )
+                read_rate, _ = self.measure(
+                    path, statements, threads, reads, self.read
+                )
+            self.stdout.write(
+                f'{title:<16}{write_rate:>14.0f}{errors:>9}{read_rate:>14.0f}'
+            )
+
+    def connect(self, path, statements):
+        connection = sqlite3.connect(path, check_same_thread=False)
+        for statement in statements:
+            connection.execute(statement)
+        return connection
+
+    def setup(self, path, statements):
+        connection = self.connect(path, statements)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        connection.close()
+
+    def write(self, connection, number):
+        with connection:
+            connection.execute(
+                WRITE, (random.randrange(POSTS), f'Комментарий {number}')
+            )
+
+    def read(self, connection, number):
+        connection.execute(READ, (random.randrange(POSTS),)).fetchall()
+
+    def measure(self, path, statements, threads, operations, operation):
+        """Операций в секунду по всем потокам и число ошибок блокировки."""
+        errors = []
+
+        def worker():
+            connection = self.connect(path, statements)
+            for number in range(operations):
+                try:
+                    operation(connection, number)
+                except sqlite3.OperationalError:
+                    errors.append(number)
+            connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return threads * operations / elapsed, len(errors)
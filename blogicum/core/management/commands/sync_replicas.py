@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.db import copy_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет копии базы для чтения (DATABASE_REPLICAS) снимком'
+        ' основной базы SQLite каждые --interval секунд.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.REPLICA_SYNC_INTERVAL,
+            help='Пауза между обновлениями, секунд.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обновить копии один раз и завершиться.',
+        )
+
+    def handle(self, *args, interval, once, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('DATABASE_REPLICAS не заданы.')
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                started = time.monotonic()
+                copy_database(source, settings.DATABASES[alias]['NAME'])
+                self.stdout.write(
+                    f'{alias}: обновлена за'
+                    f' {time.monotonic() - started:.3f} с'
+                )
+            if once:
+                return
+            time.sleep(interval)
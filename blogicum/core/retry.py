@@ -0,0 +1,142 @@
+import functools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGES = ('database is locked', 'database table is locked')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def retry_counters():
+    """Счётчики повторов текущего процесса.
+
+    `busy` — попытки, упавшие на блокировке; `retried` — повторы;
+    `recovered` — блоки, выполненные после повтора; `exhausted` — блоки,
+    для которых не хватило попыток или времени.
+    """
+    with _counters_lock:
+        return {
+            name: _counters[name]
+            for name in ('busy', 'retried', 'recovered', 'exhausted')
+        }
+
+
+def is_busy(error):
+    """Ошибка вызвана тем, что базу держит другая запись."""
+    return isinstance(error, OperationalError) and any(
+        message in str(error) for message in BUSY_MESSAGES
+    )
+
+
+def backoff(attempt):
+    """Пауза перед повтором: экспонента с полным случайным разбросом."""
+    ceiling = min(
+        settings.DB_RETRY_MAX_DELAY,
+        settings.DB_RETRY_BASE_DELAY * 2 ** attempt,
+    )
+    return random.uniform(0, ceiling)
+
+
+def call_with_retry(function, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Выполняет `function` в транзакции и повторяет её при блокировке.
+
+    Транзакция откатывается целиком и начинается заново не более
+    `DB_RETRY_ATTEMPTS` раз, пока суммарное время не превысит
+    `DB_RETRY_BUDGET` секунд. Внутри уже открытой транзакции повторять
+    нечего — её откатит и повторит внешний блок, — поэтому функция
+    вызывается один раз.
+    """
+    if transaction.get_connection(using).in_atomic_block:
+        return function(*args, **kwargs)
+    deadline = time.monotonic() + settings.DB_RETRY_BUDGET
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic(using=using):
+                result = function(*args, **kwargs)
+        except OperationalError as error:
+            if not is_busy(error):
+                raise
+            count('busy')
+            delay = backoff(attempt)
+            attempt += 1
+            if (
+                attempt > settings.DB_RETRY_ATTEMPTS
+                or time.monotonic() + delay > deadline
+            ):
+                count('exhausted')
+                logger.warning(
+                    'База занята, попыток: %s, запись отменена', attempt
+                )
+                raise
+            count('retried')
+            time.sleep(delay)
+            continue
+        if attempt:
+            count('recovered')
+        return result
+
+
+def retry_on_busy(function):
+    """Декоратор для `call_with_retry`."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return call_with_retry(function, *args, **kwargs)
+    return wrapper
+
+
+def busy_response():
+    response = HttpResponse('Сервер занят, повторите запрос.', status=503)
+    response['Retry-After'] = 1
+    return response
+
+
+class BusyRetryMiddleware:
+    """Повторяет изменяющие запросы, упавшие на блокировке SQLite.
+
+    Представление для POST и других небезопасных методов выполняется
+    в транзакции через `call_with_retry`. Если попытки кончились,
+    вместо страницы ошибки 500 отдаётся 503 с `Retry-After`.
+    Представления с атрибутом `busy_retry = False` пропускаются — например,
+    те, что пишут через очередь (`core.writes`) в другом потоке.
+    Должен стоять последним в `MIDDLEWARE`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if (
+            request.method in SAFE_METHODS
+            or not settings.DB_RETRY_ATTEMPTS
+            or not getattr(view, 'busy_retry', True)
+        ):
+            return None
+        try:
+            return call_with_retry(
+                view_func, request, *view_args, **view_kwargs
+            )
+        except OperationalError as error:
+            if not is_busy(error):
+                raise
+            return busy_response()
@@ -0,0 +1,100 @@
+import contextvars
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from core.retry import SAFE_METHODS
+
+# Приложения, чьи модели можно читать с копии.
+REPLICA_APPS = ('blog',)
+PIN_COOKIE = 'pin_primary'
+
+_replica = contextvars.ContextVar('replica', default=None)
+
+
+class ReplicaRouter:
+    """Чтение моделей блога с копии внутри `read_from_replica()`.
+
+    Всё остальное — запись, сессии, пользователи и чтение вне этого
+    блока — идёт в основную базу. Миграции к копиям не применяются:
+    их содержимое целиком копируется из основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is not None and model._meta.app_label in REPLICA_APPS:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с копии, сохраняется в основную базу.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+@contextmanager
+def read_from_replica(alias):
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def replica_synced_at(alias):
+    """Момент снимка, с которого сделана копия, или None."""
+    try:
+        return os.path.getmtime(settings.DATABASES[alias]['NAME'])
+    except OSError:
+        return None
+
+
+def fresh_replica(changed_at):
+    """Случайная копия, снятая после `changed_at` (секунды), или None.
+
+    Копия, не обновлявшаяся дольше `REPLICA_MAX_LAG` секунд, не
+    используется, даже если данные страницы с тех пор не менялись.
+    """
+    now = time.time()
+    fresh = []
+    for alias in settings.DATABASE_REPLICAS:
+        synced_at = replica_synced_at(alias)
+        if (
+            synced_at is not None
+            and synced_at > changed_at
+            and now - synced_at <= settings.REPLICA_MAX_LAG
+        ):
+            fresh.append(alias)
+    return random.choice(fresh) if fresh else None
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет за браузером основную базу после его записи.
+
+    После изменяющего запроса ставится cookie на `REPLICA_PIN_SECONDS`,
+    и пока она есть, `request.pinned_to_primary` истинно: автор видит
+    свои изменения, даже если копия ещё не обновилась.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        request.pinned_to_primary = writes or PIN_COOKIE in request.COOKIES
+        response = self.get_response(request)
+        if writes and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
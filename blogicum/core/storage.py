@@ -0,0 +1,84 @@
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_NAME_RE = re.compile(
+    r'(?:^|/)(?P<a>[0-9a-f]{2})/(?P<b>[0-9a-f]{2})/(?P=a)(?P=b)[0-9a-f]{60}'
+    r'(?:__w\d+)?\.\w+$'
+)
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    """Имя задано содержимым файла, значит файл по нему не меняется."""
+    return bool(CONTENT_NAME_RE.search(name))
+
+
+def upload_name(name):
+    """Имя для повторного `save`: `post_images/ab/cd/abcd….jpg` →
+    `post_images/abcd….jpg`.
+    """
+    if not is_content_addressed(name):
+        return name
+    directory, filename = os.path.split(name)
+    return os.path.join(
+        os.path.dirname(os.path.dirname(directory)), filename
+    )
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — sha256 его содержимого.
+
+    `post_images/photo.jpg` сохраняется как `post_images/ab/cd/abcd….jpg`:
+    два уровня подкаталогов держат каталоги небольшими, а одинаковые
+    загрузки попадают в один файл. Сколько постов ссылается на файл,
+    учитывает `StoredFile`.
+    """
+
+    def content_name(self, name, content):
+        directory, filename = os.path.split(name)
+        digest = content_hash(content)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(
+            directory, digest[:2], digest[2:4], f'{digest}{extension}'
+        )
+
+    def get_available_name(self, name, max_length=None):
+        if is_content_addressed(name):
+            # Файл с этим содержимым уже сохранил параллельный запрос.
+            raise FileExistsError(name)
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.touch(name):
+            return name
+        try:
+            return super()._save(name, content)
+        except FileExistsError:
+            return name
+
+    def touch(self, name):
+        """Обновляет время изменения файла, если он есть.
+
+        По свежему времени сборщик файлов без ссылок (`blog.media`) видит,
+        что на файл только что сослалась новая загрузка.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,63 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryTimer:
+    """Обёртка `execute_wrapper`: число запросов и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def milliseconds(seconds):
+    return f'{seconds * 1000:.2f}'
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing с временем ответа и работы с базой.
+
+    `connect` — подготовка соединения с основной базой: у нового
+    соединения это подключение и прагмы, у сохранённого (`CONN_MAX_AGE`)
+    — почти ноль. `db` — время всех SQL-запросов, `total` — весь ответ.
+    Включается `SERVER_TIMING`; должен стоять первым в `MIDDLEWARE`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING:
+            return self.get_response(request)
+        started = time.perf_counter()
+        connection = connections[DEFAULT_DB_ALIAS]
+        reused = connection.connection is not None
+        connection.ensure_connection()
+        connected = time.perf_counter()
+        queries = QueryTimer()
+        with ExitStack() as stack:
+            for database in connections.all():
+                stack.enter_context(database.execute_wrapper(queries))
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        response['Server-Timing'] = ', '.join((
+            'connect;desc="{}";dur={}'.format(
+                'reused' if reused else 'new',
+                milliseconds(connected - started),
+            ),
+            f'db;desc="{queries.count} queries";'
+            f'dur={milliseconds(queries.duration)}',
+            f'total;dur={milliseconds(finished - started)}',
+        ))
+        return response
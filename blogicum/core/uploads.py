@@ -0,0 +1,97 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+HEADER_SIZE = 12
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+)
+
+
+def is_image_header(header):
+    """Сигнатура JPEG, PNG, GIF или WebP в первых байтах файла."""
+    return header.startswith(IMAGE_SIGNATURES) or (
+        header[:4] == b'RIFF' and header[8:12] == b'WEBP'
+    )
+
+
+def check_dimensions(file):
+    """Проверяет размеры изображения по заголовку, не декодируя пиксели.
+
+    Возвращает текст ошибки или None.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        file.seek(0)
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        return (
+            f'Изображение {width}×{height} слишком большое: допускается'
+            f' не больше {settings.IMAGE_UPLOAD_MAX_PIXELS} пикселей.'
+        )
+    return None
+
+
+class RejectedUpload(UploadedFile):
+    """Метка файла, отклонённого при загрузке; причина — в `rejection`."""
+
+    def __init__(self, name, content_type, rejection):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.rejection = rejection
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Проверяет загружаемые файлы, пока тело запроса ещё приходит.
+
+    Файл отклоняется, как только в нём набирается больше
+    `IMAGE_UPLOAD_MAX_BYTES` байт или первые байты не похожи
+    на изображение. Остаток файла дальше не передаётся и не хранится.
+    Вместо файла форма получает `RejectedUpload` с причиной.
+    Обработчик должен стоять первым в `FILE_UPLOAD_HANDLERS`.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.rejection = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rejection:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.IMAGE_UPLOAD_MAX_BYTES:
+            self.rejection = (
+                'Файл больше '
+                f'{filesizeformat(settings.IMAGE_UPLOAD_MAX_BYTES)}.'
+            )
+            return None
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            if len(self.header) == HEADER_SIZE:
+                self.check_header()
+        return None if self.rejection else raw_data
+
+    def check_header(self):
+        if not is_image_header(self.header):
+            self.rejection = 'Файл не является изображением.'
+
+    def file_complete(self, file_size):
+        if self.rejection is None and len(self.header) < HEADER_SIZE:
+            self.check_header()
+        if self.rejection is None:
+            return None
+        return RejectedUpload(
+            self.file_name, self.content_type, self.rejection
+        )
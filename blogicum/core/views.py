@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.static import serve
+
+from core.retry import retry_counters
+from core.storage import is_content_addressed
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def serve_media(request, path):
+    """Отдаёт медиафайлы при разработке.
+
+    Файлы, названные по содержимому, не меняются, поэтому кэшируются
+    браузером без повторных проверок. В боевом окружении тот же заголовок
+    для `MEDIA_URL` выставляет веб-сервер.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if is_content_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+@staff_member_required
+def db_retry_stats(request):
+    """Счётчики повторов при блокировке базы в этом процессе."""
+    return JsonResponse(retry_counters())
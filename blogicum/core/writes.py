@@ -0,0 +1,138 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from core.retry import call_with_retry, is_busy
+
+
+class WriteQueueFull(Exception):
+    """Очередь записи переполнена, запрос стоит повторить позже."""
+
+
+class WriteQueueTimeout(WriteQueueFull):
+    """Запись не выполнена за `WRITE_QUEUE_RESULT_TIMEOUT` секунд."""
+
+
+class WriteQueue:
+    """Очередь коротких записей в базу, которые выполняет один поток.
+
+    Запросы не соревнуются за блокировку записи SQLite: поток-писатель
+    забирает из очереди накопившиеся задачи, до `batch` штук, и выполняет
+    их в одной транзакции. Каждая задача идёт в своей точке сохранения,
+    поэтому ошибка одной не откатывает остальные. Размер очереди
+    ограничен; если за `timeout` секунд место не освободилось, `submit`
+    бросает `WriteQueueFull`.
+    """
+
+    def __init__(self, size, batch, timeout):
+        self.tasks = queue.Queue(maxsize=size)
+        self.batch = batch
+        self.timeout = timeout
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs):
+        self.start()
+        future = Future()
+        try:
+            self.tasks.put(
+                (future, function, args, kwargs), timeout=self.timeout
+            )
+        except queue.Full:
+            raise WriteQueueFull('Очередь записи переполнена')
+        return future
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='write-queue', daemon=True
+                )
+                self.thread.start()
+
+    def take(self):
+        tasks = [self.tasks.get()]
+        while len(tasks) < self.batch:
+            try:
+                tasks.append(self.tasks.get_nowait())
+            except queue.Empty:
+                break
+        return tasks
+
+    def run(self):
+        while True:
+            tasks = self.take()
+            close_old_connections()
+            self.commit(tasks)
+
+    def commit(self, tasks):
+        tasks = [
+            task for task in tasks if task[0].set_running_or_notify_cancel()
+        ]
+        try:
+            # При блокировке базы пачка повторяется целиком.
+            results = call_with_retry(
+                lambda: [self.execute(*task) for task in tasks]
+            )
+        except Exception as error:
+            for future, *_ in tasks:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        # Результаты отдаются только после того, как транзакция записана.
+        for future, result, error in results:
+            if not future.done() and error is None:
+                future.set_result(result)
+            elif not future.done():
+                future.set_exception(error)
+
+    def execute(self, future, function, args, kwargs):
+        try:
+            with transaction.atomic():
+                return future, function(*args, **kwargs), None
+        except Exception as error:
+            if is_busy(error):
+                raise
+            return future, None, error
+
+
+_queue = None
+_queue_pid = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Очередь текущего процесса; после fork создаётся заново."""
+    global _queue, _queue_pid
+    with _queue_lock:
+        if _queue is None or _queue_pid != os.getpid():
+            _queue = WriteQueue(
+                settings.WRITE_QUEUE_SIZE,
+                settings.WRITE_QUEUE_BATCH,
+                settings.WRITE_QUEUE_TIMEOUT,
+            )
+            _queue_pid = os.getpid()
+    return _queue
+
+
+def run_write(function, *args, **kwargs):
+    """Выполняет запись через очередь, если `WRITE_QUEUE_ENABLED`.
+
+    Иначе — сразу в текущем потоке. Результат и исключения функции
+    возвращаются вызывающему в обоих случаях. Если поток-писатель не
+    выполнил запись за `WRITE_QUEUE_RESULT_TIMEOUT` секунд, ещё не начатая
+    запись отменяется и бросается `WriteQueueTimeout`; уже начатая может
+    завершиться и после ответа.
+    """
+    if not settings.WRITE_QUEUE_ENABLED:
+        return function(*args, **kwargs)
+    future = get_write_queue().submit(function, *args, **kwargs)
+    try:
+        return future.result(timeout=settings.WRITE_QUEUE_RESULT_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise WriteQueueTimeout('Очередь записи не успела выполнить запись')
@@ -41,6 +41,14 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def file_cache(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        "default": {**settings.CACHES["default"], "LOCATION": tmp_path},
+    }
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +100,7 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.images",
     "adapters.comment",
 ]
 
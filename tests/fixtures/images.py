@@ -0,0 +1,32 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from mixer.backend.django import Mixer
+from PIL import Image
+
+
+@pytest.fixture
+def image_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_JOBS_ASYNC = False
+    settings.MEDIA_COLLECT_GRACE = 0
+    return settings
+
+
+def make_image(name="large.jpg", color=(73, 109, 137), size=(1500, 1000)):
+    img_io = BytesIO()
+    Image.new("RGB", size, color=color).save(img_io, format="JPEG")
+    return ImageFile(img_io, name=name)
+
+
+@pytest.fixture
+def large_image_post(mixer: Mixer, image_settings, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        location=None,
+        image=make_image(),
+    )
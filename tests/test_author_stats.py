@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import AuthorStats, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_stats(user):
+    return AuthorStats.objects.get(user_id=user.pk)
+
+
+def test_author_stats_follow_posts_and_comments(
+        mixer, user, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    stats = get_stats(user)
+    assert (stats.post_count, stats.published_post_count) == (1, 1), (
+        "Убедитесь, что при создании поста растёт статистика его автора."
+    )
+    assert stats.last_post_date == post.pub_date
+
+    mixer.cycle(2).blend(Comment, post=post, author=another_user)
+    assert get_stats(user).comment_count == 2, (
+        "Убедитесь, что комментарии к постам автора учитываются"
+        " в его статистике."
+    )
+
+    post.refresh_from_db()
+    post.is_published = False
+    post.save()
+    assert get_stats(user).published_post_count == 0, (
+        "Убедитесь, что при снятии поста с публикации статистика автора"
+        " обновляется."
+    )
+
+    post.author = another_user
+    post.save()
+    old, new = get_stats(user), get_stats(another_user)
+    assert (old.post_count, old.comment_count, old.last_post_date) == (
+        0, 0, None
+    ), "Убедитесь, что при смене автора пост вычитается из его статистики."
+    assert (new.post_count, new.comment_count) == (1, 2)
+
+    post.delete()
+    new = get_stats(another_user)
+    assert (new.post_count, new.comment_count) == (0, 0), (
+        "Убедитесь, что при удалении поста статистика автора уменьшается."
+    )
+
+
+def test_rebuild_author_stats(user, post_with_published_location):
+    AuthorStats.objects.filter(user_id=user.pk).update(
+        post_count=10, comment_count=5
+    )
+    Post.objects.filter(author=user).update(is_published=False)
+
+    call_command("rebuild_author_stats", chunk_size=1, stdout=StringIO())
+
+    stats = get_stats(user)
+    assert (
+        stats.post_count, stats.published_post_count, stats.comment_count
+    ) == (1, 0, 0), (
+        "Убедитесь, что команда `rebuild_author_stats` пересчитывает"
+        " статистику авторов."
+    )
+
+
+def test_profile_shows_author_stats(
+        client, user_client, user, post_with_published_location
+):
+    url = f"/profile/{user.username}/"
+    response = user_client.get(url)
+    assert response.context["stats"] == get_stats(user)
+    assert "Опубликовано: 1 из 1" in response.content.decode(), (
+        "Убедитесь, что на странице профиля выводится статистика автора."
+    )
+    response = client.get(url)
+    assert "stats" not in response.context, (
+        "Убедитесь, что статистика с черновиками и отложенными постами"
+        " не показывается другим посетителям."
+    )
@@ -0,0 +1,90 @@
+import pytest
+from django.db import OperationalError
+
+from blog.views import CommentUpdateView
+from core.retry import call_with_retry, retry_counters
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(settings):
+    settings.DB_RETRY_BASE_DELAY = 0
+    settings.DB_RETRY_ATTEMPTS = 3
+
+
+def failing(times, error="database is locked"):
+    """Функция, которая первые `times` вызовов падает с `error`."""
+    calls = []
+
+    def function():
+        calls.append(1)
+        if len(calls) <= times:
+            raise OperationalError(error)
+        return len(calls)
+
+    return function
+
+
+def test_busy_block_is_retried():
+    before = retry_counters()
+    assert call_with_retry(failing(2)) == 3, (
+        "Убедитесь, что при `database is locked` блок выполняется заново."
+    )
+    after = retry_counters()
+    assert after["retried"] - before["retried"] == 2
+    assert after["recovered"] - before["recovered"] == 1
+
+
+def test_retry_budget_and_other_errors():
+    before = retry_counters()
+    with pytest.raises(OperationalError):
+        call_with_retry(failing(10))
+    assert retry_counters()["exhausted"] - before["exhausted"] == 1, (
+        "Убедитесь, что число повторов ограничено `DB_RETRY_ATTEMPTS`."
+    )
+    function = failing(1, error="no such table: blog_post")
+    with pytest.raises(OperationalError):
+        call_with_retry(function)
+    assert retry_counters()["retried"] == before["retried"] + 3
+
+
+def test_write_view_retried_by_middleware(
+        monkeypatch, mixer, user, user_client, post_with_published_location
+):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    url = f"/posts/{comment.post_id}/edit_comment/{comment.id}/"
+    form_valid = CommentUpdateView.form_valid
+    calls = []
+
+    def locked_once(self, form):
+        response = form_valid(self, form)
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("database is locked")
+        return response
+
+    monkeypatch.setattr(CommentUpdateView, "form_valid", locked_once)
+    response = user_client.post(url, data={"text": "Исправлено"})
+    assert response.status_code == 302
+    assert len(calls) == 2
+    comment.refresh_from_db()
+    assert comment.text == "Исправлено"
+
+    def always_locked(self, form):
+        form_valid(self, form)
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(CommentUpdateView, "form_valid", always_locked)
+    response = user_client.post(url, data={"text": "Не сохранится"})
+    assert response.status_code == 503, (
+        "Убедитесь, что после исчерпания попыток пользователь получает 503,"
+        " а не страницу ошибки."
+    )
+    assert response["Retry-After"]
+    comment.refresh_from_db()
+    assert comment.text == "Исправлено", (
+        "Убедитесь, что неудавшаяся попытка откатывается целиком."
+    )
@@ -0,0 +1,188 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.utils import timezone
+
+from blog.cache import version_key
+from blog.clock import SCHEDULE_KEY, from_micros, publication_state
+
+pytestmark = [pytest.mark.django_db]
+
+
+def rendered_templates(response):
+    return [template.name for template in response.templates]
+
+
+def test_post_card_fragment_cache(
+        user_client, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    response = user_client.get("/")
+    assert "includes/post_card.html" not in rendered_templates(response), (
+        "Убедитесь, что карточка поста берётся из кэша фрагментов."
+    )
+
+    post.category.title = "Обновлённая категория"
+    post.category.save()
+    response = user_client.get("/")
+    assert "Обновлённая категория" in response.content.decode(), (
+        "Убедитесь, что кэш карточки сбрасывается при изменении категории."
+    )
+
+    post.author.username = "renamed_author"
+    post.author.save()
+    response = unlogged_client.get("/")
+    assert "@renamed_author" in response.content.decode(), (
+        "Убедитесь, что кэш карточки сбрасывается при изменении автора."
+    )
+
+
+
+def test_post_card_cache_follows_row(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    # Изменение из другого процесса: сигналы здесь не срабатывают.
+    type(post).objects.filter(pk=post.pk).update(title="Заголовок из базы")
+    assert "Заголовок из базы" in user_client.get("/").content.decode(), (
+        "Убедитесь, что ключ карточки зависит от данных поста, а не только"
+        " от версий в кэше процесса."
+    )
+
+def test_anonymous_page_cache(unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+    for url in urls:
+        unlogged_client.get(url)
+        response = unlogged_client.get(url)
+        assert response.status_code == 200
+        assert not response.templates, (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша."
+        )
+
+    post.is_published = False
+    post.save()
+    assert unlogged_client.get(f"/posts/{post.id}/").status_code == 404, (
+        "Убедитесь, что снятый с публикации пост пропадает из кэша страниц."
+    )
+    for url in urls[:3]:
+        assert post.title not in unlogged_client.get(url).content.decode(), (
+            f"Убедитесь, что кэш страницы `{url}` сбрасывается, когда пост"
+            " снимают с публикации."
+        )
+
+
+
+def test_page_cache_sees_writes_of_other_processes(
+        settings, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    unlogged_client.get(url)
+    # Другой процесс меняет пост и увеличивает версию в своём экземпляре
+    # общего кэша.
+    type(post).objects.filter(pk=post.pk).update(title="Заголовок воркера")
+    other_process = FileBasedCache(
+        settings.CACHES["default"]["LOCATION"], {}
+    )
+    other_process.set(version_key("post", post.pk), time.time_ns(), None)
+    assert "Заголовок воркера" in unlogged_client.get(url).content.decode(), (
+        "Убедитесь, что версии объектов хранятся в общем для процессов"
+        " кэше `default`."
+    )
+
+def test_page_cache_skips_logged_in_users(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    response = user_client.get("/")
+    assert response.templates, (
+        "Убедитесь, что кэш страниц не применяется к авторизованным"
+        " пользователям."
+    )
+
+
+def test_publication_clock(settings, mixer, user, published_category):
+    settings.PUBLICATION_CLOCK_BUCKET = 3600
+    cache.delete(SCHEDULE_KEY)
+    publication_state()
+
+    now = timezone.now()
+    fresh = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=now - timedelta(microseconds=1),
+    )
+    later = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=now + timedelta(days=1),
+    )
+
+    effective_now, upcoming = publication_state()
+    assert fresh.pub_date <= effective_now <= timezone.now(), (
+        "Убедитесь, что только что опубликованный пост не скрывается"
+        " округлением времени."
+    )
+    assert upcoming is not None and from_micros(upcoming) <= later.pub_date, (
+        "Убедитесь, что в расписании есть ближайшая отложенная публикация."
+    )
+
+
+def test_conditional_get(
+        user_client, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    for client in (user_client, unlogged_client):
+        for url in ("/", f"/posts/{post.id}/"):
+            response = client.get(url)
+            assert response.has_header("ETag"), (
+                f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+            )
+            repeated = client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            assert repeated.status_code == 304, (
+                f"Убедитесь, что неизменившаяся страница `{url}` отдаёт 304."
+            )
+            assert not repeated.templates
+
+    response = unlogged_client.get("/")
+    assert response.has_header("Last-Modified")
+    etag = response["ETag"]
+    post.title = "Новый заголовок"
+    post.save()
+    response = unlogged_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после изменения поста страница отдаётся заново."
+    )
+
+
+def test_conditional_get_changes_after_login(
+        client, user, post_with_published_location
+):
+    user.set_password("password")
+    user.save()
+    client.force_login(user)
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    client.logout()
+    client.post(
+        "/auth/login/", {"username": user.username, "password": "password"}
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после нового входа страница с формой отдаётся"
+        " заново: в ней другой CSRF-токен."
+    )
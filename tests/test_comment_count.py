@@ -0,0 +1,40 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post, author=user)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария счётчик у поста растёт."
+    )
+
+    comments[0].delete()
+    Comment.objects.filter(pk=comments[1].pk).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария счётчик у поста уменьшается."
+    )
+
+
+def test_reconcile_comment_counts(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+
+    call_command("reconcile_comment_counts", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `reconcile_comment_counts` исправляет"
+        " расхождения счётчика комментариев."
+    )
@@ -0,0 +1,42 @@
+import os
+import re
+import shutil
+
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from core.db import connection_alive
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing(settings, client):
+    settings.SERVER_TIMING = True
+    response = client.get("/")
+    timing = response["Server-Timing"]
+    assert re.search(r'connect;desc="reused";dur=[\d.]+', timing), (
+        "Убедитесь, что Server-Timing показывает, что соединение с базой"
+        " переиспользовано."
+    )
+    assert re.search(r'db;desc="[1-9]\d* queries";dur=[\d.]+', timing)
+    assert "total;dur=" in timing
+
+    settings.SERVER_TIMING = False
+    assert "Server-Timing" not in client.get("/")
+
+
+def test_connection_to_replaced_file_is_not_reused(tmp_path):
+    path, copy = tmp_path / "db.sqlite3", tmp_path / "copy.sqlite3"
+    database = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(path)}, alias="stale"
+    )
+    database.ensure_connection()
+    assert connection_alive(database)
+    shutil.copy(path, copy)
+    os.replace(copy, path)
+    assert not connection_alive(database), (
+        "Убедитесь, что соединение с подменённым файлом базы"
+        " не переиспользуется."
+    )
+    database.close()
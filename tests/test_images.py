@@ -0,0 +1,179 @@
+import logging
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.constants import IMAGE_MAX_SIDE
+from blog.forms import PostForm
+from blog.images import variant_name
+from blog.models import ImageJob, ImageStatus, Post, StoredFile
+from fixtures.images import make_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_image_variants_created(large_image_post):
+    image = large_image_post.image
+    for width in (480, 640, 960, 1280):
+        name = variant_name(image.name, width)
+        assert image.storage.exists(name), (
+            "Убедитесь, что при сохранении поста создаются уменьшенные"
+            " копии изображения."
+        )
+        with image.storage.open(name) as fh:
+            assert Image.open(fh).width == width
+
+
+def test_post_card_uses_srcset(client, large_image_post):
+    content = client.get("/").content.decode()
+    image = large_image_post.image
+    url = image.storage.url
+    assert content.count("img-thumbnail") == 1
+    assert f'src="{url(variant_name(image.name, 480))}"' in content, (
+        "Убедитесь, что в ленте выводится уменьшенная копия изображения."
+    )
+    assert f"{url(variant_name(image.name, 960))} 960w" in content
+    assert 'width="480" height="320"' in content
+
+
+def test_image_jobs_run_in_worker_pool(image_settings, large_image_post):
+    image_settings.IMAGE_JOBS_ASYNC = True
+    post = large_image_post
+    post.image.save("queued.jpg", make_image(color=(0, 0, 0)))
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.PENDING, (
+        "Убедитесь, что новое изображение ставится в очередь обработки."
+    )
+    assert not post.image.storage.exists(variant_name(post.image.name, 480))
+
+    call_command(
+        "process_image_jobs", workers=1, once=True, stdout=StringIO()
+    )
+
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.READY, (
+        "Убедитесь, что команда `process_image_jobs` обрабатывает очередь."
+    )
+    assert post.image.storage.exists(variant_name(post.image.name, 480))
+
+
+
+def test_unprocessed_image_not_linked(
+        client, image_settings, large_image_post
+):
+    image_settings.IMAGE_JOBS_ASYNC = True
+    post = large_image_post
+    post.image.save("phone.jpg", make_image(color=(0, 0, 0)))
+    url = f"/posts/{post.id}/"
+    for page in ("/", url):
+        assert post.image.url not in client.get(page).content.decode(), (
+            "Убедитесь, что исходная загрузка с метаданными не выводится,"
+            " пока изображение не обработано."
+        )
+
+    call_command(
+        "process_image_jobs", workers=1, once=True, stdout=StringIO()
+    )
+    post.refresh_from_db()
+    assert post.image.url in client.get(url).content.decode()
+
+def test_image_job_retries_then_fails(image_settings, large_image_post):
+    post = large_image_post
+    job = ImageJob.objects.create(post=post, image=post.image.name)
+    post.image.storage.delete(post.image.name)
+    for attempt in range(1, 4):
+        ImageJob.objects.filter(pk=job.pk).update(run_after=job.created_at)
+        call_command(
+            "process_image_jobs", workers=0, once=True, stdout=StringIO()
+        )
+        job.refresh_from_db()
+        assert job.attempts == attempt
+    assert job.status == ImageJob.Status.FAILED, (
+        "Убедитесь, что после исчерпания попыток задача помечается"
+        " как неудачная."
+    )
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.FAILED
+
+
+def test_image_meta_saved_with_post(client, large_image_post):
+    post = large_image_post
+    post.refresh_from_db()
+    meta = post.image_meta
+    assert (meta["width"], meta["height"], meta["format"]) == (
+        1500, 1000, "JPEG"
+    ), "Убедитесь, что размеры и формат изображения сохраняются в посте."
+    assert meta["bytes"] == post.image.size
+    assert meta["lqip"].startswith("data:image/jpeg;base64,")
+
+    post.image.storage.delete(post.image.name)
+    content = client.get("/").content.decode()
+    assert 'width="480" height="320" loading="lazy"' in content, (
+        "Убедитесь, что размеры изображения выводятся из сохранённых"
+        " сведений, не открывая файл."
+    )
+    assert meta["lqip"] in content
+
+
+def test_backfill_image_meta(large_image_post):
+    Post.objects.update(image_meta={})
+
+    call_command("backfill_image_meta", batch_size=1, stdout=StringIO())
+
+    large_image_post.refresh_from_db()
+    assert large_image_post.image_meta["width"] == 1500, (
+        "Убедитесь, что команда `backfill_image_meta` заполняет сведения"
+        " об изображениях."
+    )
+    assert "lqip" in large_image_post.image_meta
+
+
+def test_upload_metadata_stripped_and_capped(
+        caplog, mixer, image_settings, user, published_category
+):
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"
+    img_io = BytesIO()
+    Image.new("RGB", (4000, 3000), color=(10, 20, 30)).save(
+        img_io, format="JPEG", exif=exif
+    )
+    upload = SimpleUploadedFile("phone.jpg", img_io.getvalue(), "image/jpeg")
+    form = PostForm(files={"image": upload})
+    form.is_valid()
+    assert form.cleaned_data["image"] is upload, (
+        "Убедитесь, что форма только проверяет изображение, а очищает его"
+        " задача обработки."
+    )
+
+    with caplog.at_level(logging.INFO, logger="blog.images"):
+        post = mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            location=None, image=upload,
+        )
+    post.refresh_from_db()
+    with post.image.open() as fh:
+        image = Image.open(fh)
+        assert "exif" not in image.info, (
+            "Убедитесь, что из загруженных изображений удаляются"
+            " метаданные EXIF."
+        )
+        assert max(image.size) == IMAGE_MAX_SIDE, (
+            "Убедитесь, что размер загруженных изображений ограничивается."
+        )
+    assert post.image_status == ImageStatus.READY
+    assert post.image_meta["width"] == IMAGE_MAX_SIDE
+    assert StoredFile.objects.get(name=post.image.name).refcount == 1
+    assert "→" in caplog.text
+
+
+def test_post_card_offers_webp(client, large_image_post):
+    content = client.get("/").content.decode()
+    image = large_image_post.image
+    webp = image.storage.url(variant_name(image.name, 480, ".webp"))
+    assert f'<source type="image/webp" srcset="{webp} 480w' in content, (
+        "Убедитесь, что в ленте предлагаются копии изображения в WebP."
+    )
+    assert content.count("<img") == content.count("<picture>") + 1
@@ -0,0 +1,134 @@
+import hashlib
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from blog import media
+from blog.images import variant_name
+from blog.models import Post, StoredFile
+from core.views import IMMUTABLE_CACHE_CONTROL, serve_media
+from fixtures.images import make_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_identical_uploads_share_one_file(
+        mixer, image_settings, user, published_category,
+        django_capture_on_commit_callbacks
+):
+    image = make_image("phone.jpg")
+    digest = hashlib.sha256(image.file.getvalue()).hexdigest()
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        image=lambda: make_image("other-name.JPG"),
+    )
+    name = posts[0].image.name
+    assert name == f"post_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg", (
+        "Убедитесь, что изображения сохраняются под именем sha256"
+        " содержимого в подкаталогах."
+    )
+    assert posts[1].image.name == name, (
+        "Убедитесь, что одинаковые загрузки хранятся одним файлом."
+    )
+    assert StoredFile.objects.get(name=name).refcount == 2
+
+    storage = posts[0].image.storage
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].delete()
+    assert storage.exists(name)
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[1].delete()
+    assert not storage.exists(name), (
+        "Убедитесь, что файл удаляется, когда на него не осталось ссылок."
+    )
+    assert not storage.exists(variant_name(name, 480))
+
+
+def test_collect_spares_file_reused_meanwhile(image_settings, mixer, user):
+    image_settings.MEDIA_COLLECT_GRACE = 60
+    name = mixer.blend("blog.Post", author=user, image=make_image()).image.name
+    storage = Post._meta.get_field("image").storage
+    StoredFile.objects.filter(name=name).update(refcount=0)
+    os.utime(storage.path(name), (0, 0))
+    assert storage.save("post_images/again.jpg", make_image()) == name
+    media.collect(name)
+    assert storage.exists(name), (
+        "Убедитесь, что сборщик не удаляет файл, который только что нашла"
+        " загрузка с тем же содержимым."
+    )
+
+    StoredFile.objects.create(name=name, refcount=0)
+    os.utime(storage.path(name), (0, 0))
+    media.collect(name)
+    assert not storage.exists(name)
+
+
+def test_content_addressed_media_is_immutable(image_settings, mixer, user):
+    post = mixer.blend("blog.Post", author=user, image=make_image())
+    request = RequestFactory().get(f"/media/{post.image.name}")
+    response = serve_media(request, post.image.name)
+    assert response["Cache-Control"] == IMMUTABLE_CACHE_CONTROL, (
+        "Убедитесь, что файлы, названные по содержимому, отдаются"
+        " с неизменяемыми заголовками кэширования."
+    )
+
+
+def test_collect_orphan_media(
+        mixer, image_settings, user, django_capture_on_commit_callbacks
+):
+    image_settings.MEDIA_DELETE_UNUSED = False
+    kept = mixer.blend("blog.Post", author=user, image=make_image())
+    dropped = mixer.blend(
+        "blog.Post", author=user, image=make_image(color=(0, 0, 0))
+    )
+    storage = kept.image.storage
+    legacy = "post_images/legacy.jpg"
+    with open(storage.path(legacy), "wb") as fh:
+        fh.write(make_image(color=(1, 2, 3)).file.getvalue())
+    # Старый оригинал, чьё имя похоже на имя копии.
+    banner = "post_images/banner__w100.jpg"
+    for name in (banner, variant_name(banner, 480)):
+        with open(storage.path(name), "wb") as fh:
+            fh.write(make_image(color=(4, 5, 6)).file.getvalue())
+    Post.objects.filter(pk=kept.pk).update(image=banner)
+    mixer.blend("blog.Post", author=user, image=kept.image.name)
+    orphans = [
+        dropped.image.name,
+        variant_name(dropped.image.name, 480, ".webp"),
+        legacy,
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        dropped.delete()
+    assert all(storage.exists(name) for name in orphans), (
+        "Убедитесь, что при выключенной `MEDIA_DELETE_UNUSED` файлы"
+        " не удаляются сразу."
+    )
+
+    out = StringIO()
+    call_command(
+        "collect_orphan_media", dry_run=True, min_age=0, stdout=out
+    )
+    assert set(orphans) <= set(out.getvalue().split())
+    assert all(storage.exists(name) for name in orphans)
+
+    call_command(
+        "collect_orphan_media", quarantine=".quarantine", min_age=0,
+        batch_size=1, stdout=StringIO(),
+    )
+    assert not any(storage.exists(name) for name in orphans), (
+        "Убедитесь, что команда `collect_orphan_media` убирает файлы,"
+        " на которые не ссылаются посты."
+    )
+    assert storage.exists(f".quarantine/{legacy}")
+    assert storage.exists(banner) and storage.exists(
+        variant_name(banner, 480)
+    ), (
+        "Убедитесь, что файл, на который ссылается пост, не считается"
+        " копией из-за похожего имени."
+    )
+    assert storage.exists(kept.image.name)
+    assert storage.exists(variant_name(kept.image.name, 480))
+    assert not StoredFile.objects.filter(name=dropped.image.name).exists()
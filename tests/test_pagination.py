@@ -0,0 +1,115 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+NEXT_CURSOR_RE = re.compile(r'href="\?after=([\w-]+)"')
+PREV_CURSOR_RE = re.compile(r'href="\?before=([\w-]+)"')
+
+
+def test_keyset_pagination_walks_feed(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    seen = []
+    url = "/"
+    with CaptureQueriesContext(connection) as queries:
+        while url:
+            response = user_client.get(url)
+            assert response.status_code == 200
+            seen.extend(response.context["page_obj"])
+            cursors = NEXT_CURSOR_RE.findall(response.content.decode())
+            url = f"/?after={cursors[0]}" if cursors else None
+
+    assert len(seen) == len(posts), (
+        "Убедитесь, что курсорная пагинация выводит каждую публикацию"
+        " ровно один раз."
+    )
+    assert len({post.id for post in seen}) == len(posts)
+    keys = [(post.pub_date, post.id) for post in seen]
+    assert keys == sorted(keys, reverse=True), (
+        "Убедитесь, что публикации отсортированы «от новых к старым»."
+    )
+    assert not any(
+        "COUNT(" in query["sql"] and "GROUP BY" not in query["sql"]
+        for query in queries.captured_queries
+    ), "Убедитесь, что курсорная пагинация не выполняет запрос COUNT(*)."
+
+
+def test_keyset_pagination_before_cursor(
+        user_client, many_posts_with_published_locations
+):
+    first_page = user_client.get("/")
+    next_cursor = NEXT_CURSOR_RE.findall(first_page.content.decode())[0]
+    second_page = user_client.get(f"/?after={next_cursor}")
+    prev_cursor = PREV_CURSOR_RE.findall(second_page.content.decode())[0]
+    back_page = user_client.get(f"/?before={prev_cursor}")
+    assert (
+        [post.id for post in back_page.context["page_obj"]]
+        == [post.id for post in first_page.context["page_obj"]]
+    ), "Убедитесь, что ссылка на предыдущую страницу возвращает к первой."
+    assert len(back_page.context["page_obj"]) == N_PER_PAGE
+
+
+def test_keyset_pagination_empty_page_has_no_links(
+        user_client, many_posts_with_published_locations
+):
+    first_page = user_client.get("/").context["page_obj"]
+    cursor = first_page.paginator.encode_cursor(first_page[0])
+    response = user_client.get(f"/?before={cursor}")
+    assert response.status_code == 200
+    page = response.context["page_obj"]
+    assert not page and not page.has_next() and not page.has_previous(), (
+        "Убедитесь, что у пустой страницы нет ссылок на соседние."
+    )
+    assert "=None" not in response.content.decode()
+
+
+def test_keyset_pagination_invalid_cursor(user_client):
+    response = user_client.get("/?after=not-a-cursor")
+    assert response.status_code == 404, (
+        "Убедитесь, что для некорректного курсора возвращается статус 404."
+    )
+
+
+def test_category_numbered_pages(
+        user_client, many_posts_with_published_locations
+):
+    category = many_posts_with_published_locations[0].category
+    response = user_client.get(f"/category/{category.slug}/?page=2")
+    assert response.status_code == 200
+    assert response.context["page_obj"].number == 2, (
+        "Убедитесь, что на странице категории доступна нумерованная"
+        " пагинация по параметру `page`."
+    )
+
+
+def test_comments_load_more(mixer, user, user_client,
+                            post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(25).blend("blog.Comment", post=post, author=user)
+    response = user_client.get(f"/posts/{post.id}/")
+    first_page = list(response.context["comments"])
+    assert len(first_page) == 20, (
+        "Убедитесь, что на странице поста выводится ограниченное число"
+        " комментариев."
+    )
+    more_url = re.search(
+        rf'href="(/posts/{post.id}/comments/\?after=[\w-]+)"',
+        response.content.decode(),
+    )
+    assert more_url, (
+        "Убедитесь, что на странице поста есть ссылка для подгрузки"
+        " следующих комментариев."
+    )
+    fragment = user_client.get(more_url.group(1))
+    assert fragment.status_code == 200
+    rest = list(fragment.context["comments"])
+    assert [c.id for c in first_page + rest] == [c.id for c in comments]
+    assert "<html" not in fragment.content.decode()
+    assert "comments/?after=" not in fragment.content.decode()
@@ -0,0 +1,141 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+# Перестройка расписания отложенных публикаций (blog/clock.py).
+SCHEDULE_QUERY = 'SELECT "blog_post"."pub_date" FROM'
+
+
+def queries_on(table, queries):
+    return [
+        query["sql"] for query in queries.captured_queries
+        if f'FROM "{table}"' in query["sql"]
+    ]
+
+
+def schedule_queries(queries):
+    return [
+        query["sql"] for query in queries.captured_queries
+        if query["sql"].startswith(SCHEDULE_QUERY)
+    ]
+
+
+def test_post_detail_single_query(
+        unlogged_client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    for client in (unlogged_client, user_client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        rebuilds = len(schedule_queries(queries))
+        assert rebuilds <= 1, (
+            "Убедитесь, что расписание публикаций перестраивается"
+            " одним запросом."
+        )
+        assert len(queries_on("blog_post", queries)) == 1 + rebuilds, (
+            "Убедитесь, что страница поста загружает пост одним запросом."
+        )
+
+
+def test_edit_pages_single_lookup(
+        user_client, another_user_client, user, post_with_published_location,
+        mixer
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    pages = (
+        ("blog_post", f"/posts/{post.id}/edit/"),
+        ("blog_post", f"/posts/{post.id}/delete/"),
+        ("blog_comment", f"/posts/{post.id}/edit_comment/{comment.id}/"),
+        ("blog_comment", f"/posts/{post.id}/delete_comment/{comment.id}/"),
+    )
+    for table, url in pages:
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        assert len(queries_on(table, queries)) == 1, (
+            f"Убедитесь, что страница `{url}` загружает объект один раз."
+        )
+        response = another_user_client.get(url)
+        assert response.status_code == 302, (
+            "Убедитесь, что чужой объект нельзя изменить."
+        )
+        assert response.url == f"/posts/{post.id}/"
+
+
+def test_profile_author_resolved_once(user_client, another_user):
+    url = f"/profile/{another_user.username}/"
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.context["profile"] == another_user
+    profile_lookups = [
+        sql for sql in queries_on("auth_user", queries)
+        if '"auth_user"."username" = ' in sql
+    ]
+    assert not profile_lookups, (
+        "Убедитесь, что автор профиля берётся из кэша, а не из базы на"
+        " каждый запрос."
+    )
+
+    another_user.first_name = "Переименованный"
+    another_user.save()
+    assert "Переименованный" in user_client.get(url).content.decode(), (
+        "Убедитесь, что кэш профиля сбрасывается при изменении пользователя."
+    )
+
+    another_user.username = "renamed"
+    another_user.save()
+    assert user_client.get(url).status_code == 404, (
+        "Убедитесь, что после переименования пользователя профиль"
+        " по старому имени не отдаётся из кэша."
+    )
+
+
+def test_comment_create_skips_post_row(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/comment/"
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.post(url, data={"text": "Комментарий"})
+    assert response.status_code == 302
+    assert post.comments.count() == 1
+    assert not any(
+        '"blog_post"."text"' in query["sql"]
+        for query in queries.captured_queries
+    ), "Убедитесь, что при добавлении комментария пост не загружается целиком."
+
+    post.is_published = False
+    post.save()
+    response = another_user_client.post(url, data={"text": "Комментарий"})
+    assert response.status_code == 404, (
+        "Убедитесь, что к неопубликованному посту чужого автора нельзя"
+        " добавить комментарий."
+    )
+
+
+def test_page_cache_hit_skips_database(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        assert unlogged_client.get(url).status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            response = unlogged_client.get(url)
+        assert response.status_code == 200
+        assert not queries.captured_queries, (
+            f"Убедитесь, что страница `{url}` из кэша отдаётся без"
+            " запросов к базе."
+        )
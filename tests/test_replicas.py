@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.models import Post, User
+from core.db import copy_database
+from core.routers import PIN_COOKIE, ReplicaRouter, read_from_replica
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica_settings(settings, monkeypatch, tmp_path):
+    target = tmp_path / "replica.sqlite3"
+    target.touch()
+    monkeypatch.setitem(settings.DATABASES, "replica", {
+        **settings.DATABASES["default"], "NAME": str(target)
+    })
+    settings.DATABASE_REPLICAS = ["replica"]
+    return target
+
+
+def sync(target):
+    """Отмечает копию снятой сейчас, как это делает `copy_database`."""
+    now = time.time()
+    os.utime(target, (now, now))
+
+
+def test_copy_database(tmp_path):
+    source, target = tmp_path / "primary.sqlite3", tmp_path / "copy.sqlite3"
+    connection = sqlite3.connect(source)
+    connection.execute("PRAGMA journal_mode = wal")
+    with connection:
+        connection.execute("CREATE TABLE post (title TEXT)")
+        connection.execute("INSERT INTO post VALUES ('Пост')")
+    started = copy_database(source, target)
+    connection.close()
+    connection = sqlite3.connect(target)
+    assert connection.execute("SELECT title FROM post").fetchall() == [
+        ("Пост",)
+    ], "Убедитесь, что копия содержит данные основной базы."
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == (
+        "delete"
+    )
+    connection.close()
+    assert os.path.getmtime(target) == pytest.approx(started, abs=1e-3)
+    assert not os.path.exists(f"{target}.sync")
+
+
+def test_sync_replicas_requires_replicas():
+    with pytest.raises(CommandError):
+        call_command("sync_replicas", once=True, stdout=StringIO())
+
+
+def test_router_reads_blog_from_replica(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) is None
+    with read_from_replica("replica"):
+        assert router.db_for_read(Post) == "replica"
+        assert router.db_for_read(User) is None, (
+            "Убедитесь, что пользователи и сессии читаются"
+            " с основной базы."
+        )
+        assert router.db_for_write(Post) == "default"
+    assert not router.allow_migrate("replica", "blog")
+
+
+def test_pages_read_from_fresh_replica_only(
+        monkeypatch, replica_settings, another_user_client, user_client,
+        post_with_published_location
+):
+    target = replica_settings
+    used = []
+
+    @contextmanager
+    def recording(alias):
+        used.append(alias)
+        yield
+
+    monkeypatch.setattr("blog.mixin.read_from_replica", recording)
+    sync(target)
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    assert another_user_client.get(url).status_code == 200
+    assert used == ["replica"], (
+        "Убедитесь, что страница поста читается с копии, если копия"
+        " свежее последнего изменения поста."
+    )
+
+    post.save()
+    assert another_user_client.get(url).status_code == 200
+    assert used == ["replica"], (
+        "Убедитесь, что после изменения поста, до обновления копии,"
+        " страница читается с основной базы."
+    )
+
+    sync(target)
+    user_client.cookies[PIN_COOKIE] = "1"
+    assert user_client.get(url).status_code == 200
+    assert used == ["replica"], (
+        "Убедитесь, что после своей записи пользователь читает"
+        " с основной базы."
+    )
+    response = user_client.post(f"{url}comment/", data={"text": "Текст"})
+    assert PIN_COOKIE in response.cookies
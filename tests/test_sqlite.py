@@ -0,0 +1,63 @@
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, connections
+
+from core.checks import check_sqlite_pragmas
+from core.db import _reported, read_pragmas, report_pragmas
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_pragmas_applied_on_connect():
+    pragmas = read_pragmas(connection)
+    assert pragmas["synchronous"] == "normal", (
+        "Убедитесь, что прагмы из `SQLITE_PRAGMAS` выполняются"
+        " на каждом соединении."
+    )
+    assert pragmas["busy_timeout"] == "5000"
+    assert pragmas["temp_store"] == "memory"
+
+
+def test_pragma_check_reports_effective_values(settings):
+    messages = check_sqlite_pragmas(databases=["default"])
+    assert [message.id for message in messages] == ["core.I001"]
+    assert "busy_timeout=5000" in messages[0].msg
+
+    settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, "cache_size": 1}
+    messages = check_sqlite_pragmas(databases=["default"])
+    assert "core.W001" in [message.id for message in messages], (
+        "Убедитесь, что проверка предупреждает о непринятых прагмах."
+    )
+
+
+def test_benchmark_sqlite():
+    out = StringIO()
+    call_command(
+        "benchmark_sqlite", writes=5, reads=5, threads=2, stdout=out
+    )
+    assert "SQLITE_PRAGMAS" in out.getvalue()
+
+
+def test_pragmas_reported_on_first_connection(caplog, settings):
+    caplog.set_level(logging.INFO, logger="core.db")
+    _reported.discard(connection.alias)
+    fresh = connections.create_connection(connection.alias)
+    fresh.ensure_connection()
+    fresh.connection.close()
+    assert "busy_timeout=5000" in caplog.text, (
+        "Убедитесь, что при первом соединении процесса действующие прагмы"
+        " пишутся в лог."
+    )
+    caplog.clear()
+    report_pragmas(sender=type(connection), connection=connection)
+    assert not caplog.text
+
+    settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, "cache_size": 1}
+    _reported.discard(connection.alias)
+    report_pragmas(sender=type(connection), connection=connection)
+    assert "PRAGMA cache_size" in caplog.text, (
+        "Убедитесь, что о непринятых прагмах при запуске предупреждает лог."
+    )
@@ -0,0 +1,54 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from blog.models import Post
+from fixtures.images import make_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def create_post(client, category, image):
+    return client.post("/posts/create/", data={
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2020-01-01 10:00",
+        "category": category.pk,
+        "is_published": True,
+        "image": image,
+    })
+
+
+def image_errors(response):
+    return response.context["form"].errors.get("image", [])
+
+
+@pytest.mark.parametrize("content, error", [
+    (b"%PDF-1.4" + b"0" * 100, "не является изображением"),
+    (make_image().file.getvalue() + b"0" * 4096, "Файл больше"),
+])
+def test_upload_rejected_while_streaming(
+        user_client, image_settings, published_category, content, error
+):
+    image_settings.IMAGE_UPLOAD_MAX_BYTES = 4096
+    image_settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 0
+    upload = SimpleUploadedFile("photo.jpg", content, "image/jpeg")
+    response = create_post(user_client, published_category, upload)
+    assert any(error in message for message in image_errors(response)), (
+        "Убедитесь, что слишком большие файлы и файлы, не являющиеся"
+        " изображениями, отклоняются при загрузке."
+    )
+    assert not Post.objects.exists()
+
+
+def test_upload_dimensions_checked_before_decode(
+        user_client, image_settings, published_category
+):
+    image_settings.IMAGE_UPLOAD_MAX_PIXELS = 1000
+    image = make_image(size=(100, 100))
+    upload = SimpleUploadedFile(
+        "photo.jpg", image.file.getvalue(), "image/jpeg"
+    )
+    response = create_post(user_client, published_category, upload)
+    assert any("100×100" in message for message in image_errors(response)), (
+        "Убедитесь, что размеры изображения проверяются при загрузке."
+    )
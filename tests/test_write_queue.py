@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from blog.models import Comment
+from core.writes import (
+    WriteQueue, WriteQueueFull, WriteQueueTimeout, run_write
+)
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def blocked_queue():
+    """Очередь, чей поток-писатель ждёт `release` внутри первой задачи."""
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        return release.wait(5)
+
+    write_queue = WriteQueue(size=50, batch=50, timeout=0.05)
+    batches = []
+    commit = write_queue.commit
+
+    def counting_commit(tasks):
+        batches.append(len(tasks))
+        commit(tasks)
+
+    write_queue.commit = counting_commit
+    first = write_queue.submit(block)
+    started.wait(5)
+    yield write_queue, release, batches, first
+    release.set()
+
+
+def test_writes_are_group_committed(blocked_queue):
+    write_queue, release, batches, first = blocked_queue
+    futures = [write_queue.submit(pow, number, 2) for number in range(10)]
+    release.set()
+    assert [future.result(5) for future in futures] == [
+        number ** 2 for number in range(10)
+    ]
+    assert first.result(5) is True
+    assert batches == [1, 10], (
+        "Убедитесь, что накопившиеся записи выполняются одной транзакцией."
+    )
+
+
+def test_failed_write_does_not_abort_batch(blocked_queue):
+    write_queue, release, _, _ = blocked_queue
+    failing = write_queue.submit(int, "не число")
+    passing = write_queue.submit(int, "7")
+    release.set()
+    with pytest.raises(ValueError):
+        failing.result(5)
+    assert passing.result(5) == 7
+
+
+def test_write_queue_backpressure(blocked_queue):
+    write_queue, release, _, _ = blocked_queue
+    write_queue.tasks.maxsize = 1
+    write_queue.submit(int, "1")
+    with pytest.raises(WriteQueueFull):
+        write_queue.submit(int, "2")
+
+
+def test_slow_write_queue_times_out(monkeypatch, settings, blocked_queue):
+    write_queue, release, _, first = blocked_queue
+    settings.WRITE_QUEUE_ENABLED = True
+    settings.WRITE_QUEUE_RESULT_TIMEOUT = 0.05
+    monkeypatch.setattr("core.writes.get_write_queue", lambda: write_queue)
+    calls = []
+    with pytest.raises(WriteQueueTimeout):
+        run_write(calls.append, 1)
+    release.set()
+    first.result(5)
+    assert write_queue.submit(int, "1").result(5) == 1
+    assert not calls, (
+        "Убедитесь, что запись, не дождавшаяся очереди, отменяется."
+    )
+
+
+def test_comment_saved_through_write_queue(
+        settings, user_client, post_with_published_location
+):
+    settings.WRITE_QUEUE_ENABLED = True
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Через очередь"}
+    )
+    assert response.status_code == 302
+    assert Comment.objects.filter(post=post, text="Через очередь").exists()